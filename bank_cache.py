@@ -0,0 +1,200 @@
+"""
+bank_cache.py
+
+Usage:
+    from bank_cache import is_current, open_bank
+    def read(path):                              # parse + validate the source once
+        return meta, records                     # meta: small dict or None
+    meta, records = open_bank(source_path, read)
+    records[i], len(records), list(records)      # records decode lazily from an mmap
+    is_current(source_path)                      # True if the cache matches the source's size and mtime
+
+Compiled caches of the app's JSON banks (quiz questions, Q&A pairs, quotes),
+no tkinter. The validated, normalized records are written once to
+<source>.bank next to the source, and later opens map that file into memory
+instead of parsing JSON again; a record is only decoded (marshal) when it is
+read, so opening even a very large bank costs next to nothing.
+
+Layout: a fixed struct header, the meta dict, the records back to back, then
+a table of count + 1 record offsets. The header stores the source's size,
+mtime and a BLAKE2 digest of its bytes. A cache whose size and mtime match is
+used as is; if only the mtime moved (file touched or copied) the digest
+decides, and a matching cache just gets its header restamped. Anything else
+rebuilds it. Files are replaced atomically, so a crash mid-build leaves the
+old cache or none. If the cache cannot be written, the records are returned
+as a plain list.
+"""
+
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+MAGIC = b"SABANK01"
+FORMAT_VERSION = 1
+# magic, format version, marshal version, source size, source mtime_ns,
+# source digest, record count, offsets position, meta length
+_HEADER = struct.Struct("<8sHHqq16sQQI")
+_DIGEST_SIZE = 16
+
+
+def cache_path(source):
+    source = Path(source)
+    return source.with_name(source.name + ".bank")
+
+
+def _digest(path):
+    h = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    with Path(path).open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.digest()
+
+
+class CompiledBank:
+    """Read-only sequence over a compiled bank file; records decode on access."""
+
+    def __init__(self, path):
+        with Path(path).open("rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header = _HEADER.unpack_from(self._mm, 0)
+            (magic, version, marshal_version, self.source_size, self.source_mtime_ns,
+             self.source_digest, count, offsets_pos, meta_len) = header
+            if magic != MAGIC or version != FORMAT_VERSION or marshal_version != marshal.version:
+                raise ValueError(f"{path} is not a compatible bank cache")
+            self.meta = marshal.loads(self._mm[_HEADER.size:_HEADER.size + meta_len])
+            self._count = count
+            self._offsets = memoryview(self._mm)[offsets_pos:offsets_pos + 8 * (count + 1)].cast("Q")
+        except BaseException:
+            # a truncated or foreign file: do not leave it mapped
+            self._mm.close()
+            raise
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("bank record index out of range")
+        return marshal.loads(self._mm[self._offsets[i]:self._offsets[i + 1]])
+
+    def __iter__(self):
+        mm, offsets = self._mm, self._offsets
+        for i in range(self._count):
+            yield marshal.loads(mm[offsets[i]:offsets[i + 1]])
+
+    def matches(self, stat):
+        return (self.source_size, self.source_mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+    def close(self):
+        # the offsets view must go first: an mmap with exported buffers cannot close
+        self._offsets.release()
+        self._mm.close()
+
+
+def write_bank(path, records, meta, stat, digest):
+    """Compile records (any iterable, consumed once) into path, atomically."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    meta_bytes = marshal.dumps(meta)
+    offsets = array("Q")
+    try:
+        with tmp.open("wb") as fh:
+            fh.write(bytes(_HEADER.size))
+            fh.write(meta_bytes)
+            pos = _HEADER.size + len(meta_bytes)
+            for rec in records:
+                data = marshal.dumps(rec)
+                offsets.append(pos)
+                fh.write(data)
+                pos += len(data)
+            offsets.append(pos)
+            # native byte order, like the marshal version check: the cache never leaves this machine
+            fh.write(offsets.tobytes())
+            fh.seek(0)
+            fh.write(_HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version, stat.st_size, stat.st_mtime_ns,
+                                  digest, len(offsets) - 1, pos, len(meta_bytes)))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _restamp(path, stat):
+    # same content under a new mtime: only the header changes
+    with Path(path).open("r+b") as fh:
+        header = list(_HEADER.unpack(fh.read(_HEADER.size)))
+        header[3], header[4] = stat.st_size, stat.st_mtime_ns
+        fh.seek(0)
+        fh.write(_HEADER.pack(*header))
+
+
+def is_current(source, path=None):
+    """
+    True if the cache at path (default <source>.bank) is stamped with source's
+    current size and mtime. Reads only the cache header, never the source.
+    """
+    source = Path(source)
+    path = Path(path) if path else cache_path(source)
+    try:
+        stat = source.stat()
+        with path.open("rb") as fh:
+            header = _HEADER.unpack(fh.read(_HEADER.size))
+    except (OSError, struct.error):
+        return False
+    magic, version, marshal_version, size, mtime_ns = header[:5]
+    return ((magic, version, marshal_version) == (MAGIC, FORMAT_VERSION, marshal.version)
+            and (size, mtime_ns) == (stat.st_size, stat.st_mtime_ns))
+
+
+def open_bank(source, read, path=None):
+    """
+    (meta, records) for source. read(source) -> (meta, iterable of records) is
+    only called when the cache at path (default <source>.bank) is missing or stale.
+    """
+    source = Path(source)
+    path = Path(path) if path else cache_path(source)
+    stat = source.stat()
+    bank = None
+    if path.exists():
+        try:
+            bank = CompiledBank(path)
+        except (OSError, ValueError, TypeError, EOFError, struct.error) as e:
+            print(f"bank_cache: rebuilding unreadable {path.name}: {e}", file=sys.stderr)
+    if bank is not None:
+        if bank.matches(stat):
+            return bank.meta, bank
+        digest = _digest(source)
+        if digest == bank.source_digest:
+            try:
+                _restamp(path, stat)
+            except OSError:
+                pass  # still valid; it is just re-hashed next time
+            return bank.meta, bank
+        bank.close()  # Windows cannot replace a file that is still mapped
+    else:
+        digest = _digest(source)
+
+    meta, records = read(source)
+    try:
+        write_bank(path, records, meta, stat, digest)
+        return meta, CompiledBank(path)
+    except (OSError, ValueError) as e:
+        print(f"bank_cache: could not write {path.name}, using {source.name} directly: {e}", file=sys.stderr)
+        # records may be a half-consumed generator: read again
+        meta, records = read(source)
+        return meta, list(records)
@@ -0,0 +1,203 @@
+"""
+bench_qa.py
+
+Usage:
+    python bench_qa.py [--pairs 100000] [--queries 200] [--seed 7] [--semantic] [--cache-size 256]
+
+Benchmarks Q&A search on a synthetic bank (no tkinter needed). Each query is
+built from a few words of a known target question plus common filler words, so
+ranking quality can be reported as MRR@5 (mean reciprocal rank of the target in
+the top five). The original linear-scan scorer from qa.py is kept here as the
+baseline.
+
+It also replays a class session through QueryCache: a stream of searches where
+a few questions are asked over and over (Zipf-distributed), with a new pair
+taught every so often, and reports the cache's hit rate and the mean latency
+with and without it, to help choose --cache-size.
+
+--semantic also benchmarks the LSA index (qa_semantic.py, needs numpy) on a
+bank whose pairs are drawn from topics (LSA finds nothing in independent random
+words): its approximate nearest-neighbour search against exact brute-force
+cosine similarity, reporting latency and recall@5, the share of the exact top
+five it returns.
+"""
+
+import argparse
+import itertools
+import random
+import statistics
+import sys
+import time
+
+from qa_index import QAIndex, QueryCache, tokenize
+
+COMMON = ["what", "is", "how", "do", "i", "the", "a", "in", "of", "to", "use", "can", "why"]
+
+
+def make_bank(n_pairs, seed, vocab_size=20000):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    # Zipf-ish weights so some content words are much more common than others
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(vocab_size)))
+    bank = []
+    for _ in range(n_pairs):
+        words = rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(4, 9))
+        fillers = rng.sample(COMMON, 3)
+        question = " ".join(fillers[:2] + words[:2] + fillers[2:] + words[2:]) + "?"
+        answer = " ".join(rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(12, 30))) + "."
+        tags = sorted(set(rng.choices(words, k=2)))
+        bank.append({"question": question, "answer": answer, "tags": tags})
+    return bank
+
+
+def make_topic_bank(n_pairs, seed, n_topics=200, topic_words=60, vocab_size=20000):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    topics = [rng.sample(vocab, topic_words) for _ in range(n_topics)]
+    bank = []
+    for _ in range(n_pairs):
+        topic = rng.choice(topics)
+        words = rng.sample(topic, rng.randint(3, 7))
+        question = " ".join(rng.sample(COMMON, 2) + words) + "?"
+        answer = " ".join(rng.choices(topic, k=rng.randint(10, 25)) + rng.choices(vocab, k=3)) + "."
+        bank.append({"question": question, "answer": answer, "tags": words[:1]})
+    return bank
+
+
+def make_queries(bank, n_queries, seed):
+    rng = random.Random(seed + 1)
+    queries = []
+    for target in rng.sample(range(len(bank)), n_queries):
+        content = [t for t in tokenize(bank[target]["question"]) if t not in COMMON]
+        picked = rng.sample(content, min(3, len(content)))
+        queries.append((" ".join(rng.sample(COMMON, 2) + picked), target))
+    return queries
+
+
+def baseline_search(qa_list, q):
+    """The original on_search scoring: a full scan that re-tokenizes every pair."""
+    def score(query_tokens, text_tokens):
+        if not query_tokens or not text_tokens:
+            return 0.0
+        set_q, set_t = set(query_tokens), set(text_tokens)
+        overlap_score = len(set_q & set_t) / max(len(set_q), 1)
+        substring_bonus = 0.5 if " ".join(query_tokens) in " ".join(text_tokens) else 0.0
+        return overlap_score + substring_bonus
+
+    q_toks = tokenize(q)
+    scored = []
+    for i, item in enumerate(qa_list):
+        text_toks = tokenize(item["question"] + " " + " ".join(item.get("tags", [])))
+        s = score(q_toks, text_toks)
+        if any(t in q_toks for t in item.get("tags", [])):
+            s += 0.25
+        if s > 0:
+            scored.append((s, i))
+    for i, item in enumerate(qa_list):
+        if q.lower() in item["answer"].lower():
+            scored.append((0.15, i))
+    best = {}
+    for sc, idx in scored:
+        best[idx] = max(best.get(idx, 0.0), sc)
+    return sorted(((s, i) for i, s in best.items()), key=lambda x: x[0], reverse=True)
+
+
+def run(name, search, queries):
+    latencies, rr = [], []
+    for q, target in queries:
+        t0 = time.perf_counter()
+        ranked = search(q)
+        latencies.append(time.perf_counter() - t0)
+        top = [idx for _, idx in ranked[:5]]
+        rr.append(1.0 / (top.index(target) + 1) if target in top else 0.0)
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<14}{statistics.mean(latencies) * 1000:>10.2f}{p95 * 1000:>10.2f}{statistics.mean(rr):>9.3f}")
+    return statistics.mean(latencies)
+
+
+def run_session(index, queries, cache_size, seed, n_searches=2000, teach_every=100):
+    rng = random.Random(seed + 3)
+    distinct = [q for q, _ in queries]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(distinct))))
+    stream = rng.choices(distinct, cum_weights=cum_weights, k=n_searches)
+    cache = QueryCache(index, cache_size)
+    timings = {"uncached": 0.0, "cached": 0.0}
+    for i, q in enumerate(stream):
+        if i and i % teach_every == 0:
+            # teach a pair built from an earlier question's words, as a student would
+            words = tokenize(rng.choice(distinct))
+            item = {"question": " ".join(words) + "?", "answer": " ".join(words[::-1]) + ".", "tags": []}
+            index.add(item)
+            cache.invalidate()
+        t0 = time.perf_counter()
+        index.search(q, limit=5)
+        timings["uncached"] += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        cache.search(q, limit=5)
+        timings["cached"] += time.perf_counter() - t0
+    st = cache.stats()
+    print(f"\nsession of {n_searches} searches over {len(distinct)} questions, "
+          f"a pair taught every {teach_every}:")
+    print(f"  cache size {cache_size}: hit rate {st['hit_rate']:.1%}, {st['invalidations']} entries invalidated")
+    print(f"  mean ms uncached {timings['uncached'] / n_searches * 1000:.2f}, "
+          f"cached {timings['cached'] / n_searches * 1000:.2f}")
+
+
+def run_semantic(n_pairs, n_queries, seed):
+    from qa_semantic import LSAIndex
+
+    bank = make_topic_bank(n_pairs, seed)
+    rng = random.Random(seed + 2)
+    # queries worded like an answer, not like the question
+    queries = [" ".join(rng.sample(bank[i]["answer"].rstrip(".").split(), 3))
+               for i in rng.sample(range(n_pairs), n_queries)]
+
+    t0 = time.perf_counter()
+    lsa = LSAIndex(bank)
+    print(f"\nLSA index ({lsa.dims} dims) built in {time.perf_counter() - t0:.2f}s\n")
+    print(f"{'engine':<14}{'mean ms':>10}{'p95 ms':>10}{'recall@5':>10}")
+    results = {}
+    for name, exact in (("lsa exact", True), ("lsa ivf", False)):
+        latencies, results[name] = [], []
+        for q in queries:
+            t0 = time.perf_counter()
+            results[name].append([idx for _, idx in lsa.search(q, limit=5, exact=exact)])
+            latencies.append(time.perf_counter() - t0)
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        recall = statistics.mean(len(set(got) & set(want)) / len(want) if want else 1.0
+                                 for got, want in zip(results[name], results["lsa exact"]))
+        print(f"{name:<14}{statistics.mean(latencies) * 1000:>10.2f}{p95 * 1000:>10.2f}{recall:>10.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Q&A search on a synthetic bank.")
+    parser.add_argument("--pairs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--baseline-queries", type=int, default=20,
+                        help="queries to run through the slow linear-scan baseline")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--semantic", action="store_true", help="also benchmark LSA search (needs numpy)")
+    parser.add_argument("--cache-size", type=int, default=256, help="QueryCache size for the session replay")
+    args = parser.parse_args(argv)
+
+    bank = make_bank(args.pairs, args.seed)
+    queries = make_queries(bank, args.queries, args.seed)
+
+    t0 = time.perf_counter()
+    index = QAIndex(bank)
+    print(f"{args.pairs} pairs, index built in {time.perf_counter() - t0:.2f}s\n")
+
+    print(f"{'engine':<14}{'mean ms':>10}{'p95 ms':>10}{'MRR@5':>9}")
+    base = run("linear scan", lambda q: baseline_search(bank, q), queries[:args.baseline_queries])
+    fast = run("bm25 index", index.search, queries)
+    print(f"\nspeedup: {base / fast:.1f}x")
+    run_session(index, queries, args.cache_size, args.seed)
+    if args.semantic:
+        run_semantic(args.pairs, args.queries, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+bench_quiz.py
+
+Usage:
+    python bench_quiz.py [--questions 100000] [--sessions 5000] [--size 20] [--modes quiz,adaptive,review]
+                         [--seed 7] [--max-p95-ms 5]
+
+Simulates quiz sessions against a generated bank without a display, driving
+quiz_engine.QuizEngine the way the Tk view does. The bank is written as JSONL
+to a temporary directory and opened through its compiled cache, as the app
+does. Sessions rotate through the chosen modes (a random quiz, an adaptive
+quiz, a spaced-repetition review) and a simulated student answers every
+question: each question has a hidden difficulty that sets how likely the
+answer is right and how long it takes. The simulated clock moves forward a
+few hours per session so that review cards fall due.
+
+Reports sessions per second and the latency of each engine operation, then
+repeats a shorter run under tracemalloc for memory per session. The answer
+history is kept in memory, so disk writes are not part of the timings. With
+--max-p95-ms the exit status is 1 if any operation's p95 goes over the limit,
+so CI can catch regressions.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from quiz_bank import open_questions
+from quiz_engine import QuizEngine
+from quiz_srs import SpacedRepetition
+
+MODES = ("quiz", "adaptive", "review")
+HOURS_PER_SESSION = 4
+
+
+def write_bank(path, n_questions, seed):
+    rng = random.Random(seed)
+    with Path(path).open("w", encoding="utf-8") as fh:
+        for i in range(n_questions):
+            options = [f"option {i}-{k}" for k in range(rng.randint(2, 5))]
+            q = {"question": f"Question {i}: which option is right?", "options": options,
+                 "answer": rng.randrange(len(options)), "difficulty": round(rng.random(), 3)}
+            fh.write(json.dumps(q) + "\n")
+
+
+class Student:
+    """Answers right with a chance falling with the question's difficulty, slower on hard ones."""
+
+    def __init__(self, difficulty, seed):
+        self.difficulty = difficulty        # question text -> 0..1
+        self.rng = random.Random(seed)
+
+    def answer(self, q):
+        d = self.difficulty.get(q["question"], 0.5)
+        if self.rng.random() < 0.95 - 0.6 * d:
+            choice = q["answer"]
+        else:
+            choice = (q["answer"] + 1 + self.rng.randrange(len(q["options"]) - 1)) % len(q["options"])
+        return choice, self.rng.uniform(2.0, 8.0 + 30.0 * d)
+
+
+def simulate(engine, student, n_sessions, size, modes, clock):
+    """Run n_sessions; returns {operation: [seconds, ...]} and the run time."""
+    timings = {}
+
+    def timed(op, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings.setdefault(op, []).append(time.perf_counter() - t0)
+        return result
+
+    t_start = time.perf_counter()
+    for s in range(n_sessions):
+        mode = modes[s % len(modes)]
+        clock += HOURS_PER_SESSION * 3600
+        if mode == "review":
+            if not timed("start_review", engine.start_review, size, now=clock):
+                continue
+        else:
+            timed(f"start_{mode}", engine.start_quiz, size=size, shuffle=True, adaptive=mode == "adaptive")
+        while not engine.finished:
+            choice, seconds = student.answer(engine.current)
+            timed("answer", engine.answer, choice, seconds, now=clock)
+        timed("review_items", engine.review_items)
+    return timings, time.perf_counter() - t_start
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def report(timings):
+    print(f"{'operation':<16}{'count':>9}{'mean us':>10}{'p95 us':>10}{'p99 us':>10}")
+    worst = 0.0
+    for op, values in timings.items():
+        p95 = _percentile(values, 0.95)
+        worst = max(worst, p95)
+        print(f"{op:<16}{len(values):>9}{statistics.mean(values) * 1e6:>10.1f}"
+              f"{p95 * 1e6:>10.1f}{_percentile(values, 0.99) * 1e6:>10.1f}")
+    return worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate quiz sessions on a generated bank.")
+    parser.add_argument("--questions", type=int, default=100000)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--size", type=int, default=20, help="questions per session")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated, from " + ", ".join(MODES))
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-p95-ms", type=float, default=None,
+                        help="exit with status 1 if any operation's p95 latency exceeds this")
+    args = parser.parse_args(argv)
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown or not modes:
+        parser.error(f"unknown mode(s) {unknown}; expected some of {MODES}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bank_file = Path(tmp) / "bench_questions.jsonl"
+        write_bank(bank_file, args.questions, args.seed)
+        t0 = time.perf_counter()
+        open_questions(bank_file)
+        print(f"{args.questions} questions, compiled in {time.perf_counter() - t0:.2f}s", end="")
+        t0 = time.perf_counter()
+        open_questions(bank_file)
+        print(f", reopened in {(time.perf_counter() - t0) * 1000:.2f} ms\n")
+        difficulty = {q["question"]: float(q.get("difficulty", 0.5)) for q in _raw(bank_file)}
+
+        def new_engine(seed):
+            return QuizEngine(lambda: open_questions(bank_file), sample_size=args.size,
+                              history=SpacedRepetition(log_file=None), rng=random.Random(seed))
+
+        engine = new_engine(args.seed)
+        if "adaptive" in modes or "review" in modes:
+            t0 = time.perf_counter()
+            engine.load_history()
+            print(f"answer history loaded over the bank in {time.perf_counter() - t0:.2f}s")
+        if "adaptive" in modes:
+            t0 = time.perf_counter()
+            engine.start_quiz(adaptive=True)    # builds the sampler
+            print(f"adaptive sampler built in {time.perf_counter() - t0:.2f}s")
+        clock = time.time()
+        timings, elapsed = simulate(engine, Student(difficulty, args.seed), args.sessions, args.size, modes, clock)
+        print(f"\n{args.sessions} sessions ({', '.join(modes)}) in {elapsed:.2f}s: "
+              f"{args.sessions / elapsed:.0f} sessions/s\n")
+        worst = report(timings)
+
+        # memory: a fresh engine under tracemalloc (which slows everything down,
+        # hence the separate, shorter run)
+        n_mem = max(1, min(args.sessions, 500))
+        tracemalloc.start()
+        engine = new_engine(args.seed + 1)
+        if "adaptive" in modes or "review" in modes:
+            engine.load_history()
+        base = tracemalloc.get_traced_memory()[0]
+        simulate(engine, Student(difficulty, args.seed + 1), n_mem, args.size, modes, clock)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"\nmemory: engine with loaded history {base / 2 ** 20:.1f} MiB; after {n_mem} sessions "
+              f"+{(current - base) / 1024:.0f} KiB ({(current - base) / n_mem:.0f} B/session), "
+              f"peak {peak / 2 ** 20:.1f} MiB")
+        del engine  # releases the bank's mmap before the directory is removed
+
+    if args.max_p95_ms is not None and worst * 1000 > args.max_p95_ms:
+        print(f"\nFAIL: p95 {worst * 1000:.2f} ms exceeds --max-p95-ms {args.max_p95_ms}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _raw(path):
+    # the generator's extra "difficulty" field is dropped by the bank's normalization
+    with Path(path).open("rb") as fh:
+        for line in fh:
+            yield json.loads(line)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+bench_summarizer.py
+
+Usage:
+    python bench_summarizer.py [--notes-dir sample_notes] [--repeats 3]
+
+Compares the fp32 and int8 summarizer backends on a fixed corpus of local sample
+notes (sample_notes/*.txt). For each backend it reports load time, resident
+memory growth, serialized model size and per-document latency (median of the
+repeats, after one warm-up run). Quality is reported as ROUGE-1/2/L F1 of the
+int8 summaries measured against the fp32 summaries, since the samples have no
+hand-written reference summaries. Both backends load in the same process, so the
+serialized model size is the more reliable memory comparison.
+"""
+
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import summarizer
+
+BASE_DIR = Path(__file__).parent
+
+
+def _tokens(text):
+    return "".join(c if c.isalnum() else " " for c in text.lower()).split()
+
+
+def _ngrams(tokens, n):
+    counts = {}
+    for i in range(len(tokens) - n + 1):
+        gram = tuple(tokens[i:i + n])
+        counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def _f1(overlap, cand_total, ref_total):
+    if not overlap or not cand_total or not ref_total:
+        return 0.0
+    precision, recall = overlap / cand_total, overlap / ref_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(candidate, reference, n):
+    cand, ref = _ngrams(_tokens(candidate), n), _ngrams(_tokens(reference), n)
+    overlap = sum(min(c, ref.get(g, 0)) for g, c in cand.items())
+    return _f1(overlap, sum(cand.values()), sum(ref.values()))
+
+
+def rouge_l(candidate, reference):
+    cand, ref = _tokens(candidate), _tokens(reference)
+    # longest common subsequence, one row at a time
+    prev = [0] * (len(ref) + 1)
+    for a in cand:
+        row = [0]
+        for j, b in enumerate(ref):
+            row.append(prev[j] + 1 if a == b else max(prev[j + 1], row[j]))
+        prev = row
+    return _f1(prev[-1], len(cand), len(ref))
+
+
+def _model_size_mb(manager):
+    import torch
+    buf = io.BytesIO()
+    torch.save(manager.get().model.state_dict(), buf)
+    return buf.tell() / (1024 * 1024)
+
+
+def run_backend(backend, docs, repeats):
+    manager = summarizer.ModelManager(backend=backend)
+    summarizer.model = manager  # summarize_notes and chunk_text use the module-level manager
+    manager.get()
+    stats = manager.stats()
+
+    outputs, latencies = [], []
+    for _, text in docs:
+        summarizer.summarize_notes(text, use_cache=False)  # warm-up
+        times = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            summary = summarizer.summarize_notes(text, use_cache=False)
+            times.append(time.perf_counter() - t0)
+        outputs.append(summary)
+        latencies.append(statistics.median(times))
+
+    rss_growth = None
+    if stats["rss_before_mb"] is not None and stats["rss_after_mb"] is not None:
+        rss_growth = stats["rss_after_mb"] - stats["rss_before_mb"]
+    return {
+        "backend": backend,
+        "load_seconds": stats["load_seconds"],
+        "rss_growth_mb": rss_growth,
+        "model_size_mb": _model_size_mb(manager),
+        "latencies": latencies,
+        "outputs": outputs,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark fp32 vs int8 summarizer backends.")
+    parser.add_argument("--notes-dir", default=str(BASE_DIR / "sample_notes"))
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    docs = [(p.name, p.read_text(encoding="utf-8")) for p in sorted(Path(args.notes_dir).glob("*.txt"))]
+    if not docs:
+        print(f"no sample notes in {args.notes_dir}", file=sys.stderr)
+        return 1
+
+    # fp32 first: its summaries are the reference for the int8 ROUGE scores
+    results = [run_backend(backend, docs, args.repeats) for backend in summarizer.BACKENDS]
+    reference = results[0]["outputs"]
+
+    print(f"{len(docs)} documents, median of {args.repeats} runs each\n")
+    print(f"{'backend':<8}{'load s':>9}{'rss +MB':>10}{'size MB':>10}{'mean s/doc':>12}"
+          f"{'ROUGE-1':>9}{'ROUGE-2':>9}{'ROUGE-L':>9}")
+    for res in results:
+        pairs = list(zip(res["outputs"], reference))
+        r1 = statistics.mean(rouge_n(c, r, 1) for c, r in pairs)
+        r2 = statistics.mean(rouge_n(c, r, 2) for c, r in pairs)
+        rl = statistics.mean(rouge_l(c, r) for c, r in pairs)
+        rss = f"{res['rss_growth_mb']:.0f}" if res["rss_growth_mb"] is not None else "n/a"
+        print(f"{res['backend']:<8}{res['load_seconds']:>9.2f}{rss:>10}{res['model_size_mb']:>10.1f}"
+              f"{statistics.mean(res['latencies']):>12.3f}{r1:>9.3f}{r2:>9.3f}{rl:>9.3f}")
+
+    print("\nper-document latency (s):")
+    for i, (name, _) in enumerate(docs):
+        cells = "".join(f"{res['latencies'][i]:>10.3f}" for res in results)
+        print(f"  {name:<28}{cells}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,6 @@ from ttkbootstrap import Style
 from PIL import Image, ImageTk, ImageEnhance
 import itertools
 import time
-import random
 import datetime
 import os
 from pathlib import Path
@@ -18,22 +17,17 @@ import importlib.util
 import traceback
 import sys
 
+from quote_service import shared_quotes
+
 # Ensure working directory is the script's directory so relative imports/files work
 BASE_DIR = Path(__file__).resolve().parent
 os.chdir(BASE_DIR)
 
 # --- User Settings ---
 USER_NAME = "Anjali"
-
-# --- Motivational Quotes (fallback) ---
-QUOTES = [
-    "Success is not the key to happiness. Happiness is the key to success.",
-    "Don’t watch the clock; do what it does. Keep going.",
-    "The secret of getting ahead is getting started.",
-    "Believe you can and you're halfway there.",
-    "Your limitation—it’s only your imagination.",
-    "Push yourself, because no one else is going to do it for you."
-]
+# Load the t5 summarizer in the background once the window is idle after startup.
+# Set to False to load it on demand the first time notes are summarized.
+PRELOAD_SUMMARIZER = True
 
 # --- Theme and Style ---
 style = Style(theme="flatly")
@@ -119,9 +113,20 @@ avatar_pulse_step()
 
 # --- Utilities ---
 feature_cards = []
+# called once before the current screen's widgets are destroyed (leaving the
+# screen or closing the window), while they can still be read
+leave_hooks = []
+
+
+def run_leave_hooks():
+    hooks = leave_hooks[:]
+    leave_hooks.clear()
+    for hook in hooks:
+        hook()
 
 
 def clear_main_area():
+    run_leave_hooks()
     for widget in main_area.winfo_children():
         widget.destroy()
     feature_cards.clear()
@@ -142,16 +147,21 @@ def show_home():
                         bg=bg_gradient_top, fg=accent)
     greet_lbl.place(relx=0.5, y=60, anchor="center")
 
-    quote_var = tk.StringVar(value=random.choice(QUOTES))
+    # quotes come from motivate_quotes.json, loaded once and shared with Motivate Me
+    # (quote_service.py); dealing the next one never reads the disk
+    quotes = shared_quotes()
+    quote_var = tk.StringVar(value=quotes.next() or "")
     quote_lbl = tk.Label(main_area, textvariable=quote_var, font=("Segoe UI", 16, "italic"),
                          bg=bg_gradient_top, fg="#FFF6E0", wraplength=700, padx=20)
     quote_lbl.place(relx=0.5, y=120, anchor="center")
 
     def rotate_quote():
-        quote_var.set(random.choice(QUOTES))
+        if not quote_lbl.winfo_exists():
+            return  # the home screen was left; a later visit starts its own rotation
+        quote_var.set(quotes.next() or "")
         root.after(5000, rotate_quote)
 
-    rotate_quote()
+    root.after(5000, rotate_quote)
 
     card_titles = ["Q&A", "Notes", "Planner", "Quiz", "Motivate Me"]
     card_icons = ["🧠", "📝", "📅", "🎮", "💡"]
@@ -195,42 +205,151 @@ def show_feature(name):
              bg=bg_gradient_top, fg=accent).place(relx=0.5, y=100, anchor="center")
 
 
-# --- Notes Summarizer UI (imports summarizer lazily inside function) ---
+# --- Notes Summarizer UI (summaries run on a background worker, polled with root.after) ---
+summary_worker = None
+
+
+def get_summary_worker():
+    global summary_worker
+    if summary_worker is None:
+        from summary_worker import SummaryWorker
+        summary_worker = SummaryWorker()
+    return summary_worker
+
+
 def show_notes_summarizer():
     clear_main_area()
     tk.Label(main_area, text="Notes Summarizer", font=("Comic Sans MS", 24, "bold"),
              bg=bg_gradient_top, fg=accent).place(relx=0.5, y=40, anchor="center")
 
-    tk.Label(main_area, text="Paste your notes below:", font=("Segoe UI", 12),
+    tk.Label(main_area, text="Paste your notes below (saved automatically):", font=("Segoe UI", 12),
              bg=bg_gradient_top, fg="#FFF6E0").place(x=60, y=90)
 
     notes_entry = tk.Text(main_area, height=13, width=70, font=("Segoe UI", 11))
     notes_entry.place(x=60, y=120)
 
+    from notes_store import NotesStore
+    notes_store = NotesStore()
+    try:
+        notes_entry.insert("1.0", notes_store.load_text())
+    except Exception as e:
+        messagebox.showerror("Error loading notes", str(e))
+
+    autosave = {"after_id": None}
+
+    def save_notes():
+        autosave["after_id"] = None
+        if not notes_entry.winfo_exists():
+            return
+        try:
+            notes_store.save_text(notes_entry.get("1.0", "end-1c"))
+        except Exception as e:
+            messagebox.showerror("Error saving notes", str(e))
+
+    def schedule_autosave(event=None):
+        # save a second after the user stops typing
+        if autosave["after_id"] is not None:
+            root.after_cancel(autosave["after_id"])
+        autosave["after_id"] = root.after(1000, save_notes)
+
+    def flush_autosave():
+        # leaving the screen destroys the widget (and Tk reports it gone already
+        # in <Destroy>); save a pending edit before that
+        if autosave["after_id"] is not None:
+            root.after_cancel(autosave["after_id"])
+            save_notes()
+
+    leave_hooks.append(flush_autosave)
+    notes_entry.bind("<KeyRelease>", schedule_autosave)
+    notes_entry.bind("<<Paste>>", schedule_autosave, add="+")
+
     summary_label = tk.Label(main_area, text="Summary will appear here.", font=("Segoe UI", 12, "italic"),
                              bg=bg_gradient_top, fg="#FFD580", wraplength=700, justify="left")
     summary_label.place(x=60, y=370)
 
+    job_state = {"job": None}
+    mode_var = tk.StringVar(master=main_area, value="abstractive")
+
+    def poll_job():
+        job = job_state["job"]
+        worker = get_summary_worker()
+        if job is None:
+            return
+        if not summary_label.winfo_exists():
+            # user navigated away; stop the running job instead of finishing it for nobody
+            worker.cancel(job)
+            job_state["job"] = None
+            return
+        for job_id, kind, payload in worker.poll():
+            if job_id != job.id:
+                continue  # leftovers from a replaced job
+            if kind == "partial":
+                # long notes are summarized chunk by chunk; show progress as it arrives
+                partial, done, total = payload
+                summary_label.config(text=f"Summarizing changed paragraphs ({done} of {total})...\n\n{partial}",
+                                     fg="grey")
+                continue
+            if kind == "done":
+                summary_label.config(text=payload, fg="#FFD580")
+            elif kind == "cancelled":
+                summary_label.config(text="Summary cancelled.", fg="grey")
+            elif isinstance(payload, ModuleNotFoundError):
+                summary_label.config(text="summarizer.py not found. Place it next to main.py", fg="red")
+            else:
+                summary_label.config(text=f"Error: {payload}", fg="red")
+            job_state["job"] = None
+            cancel_btn.config(state="disabled")
+            return
+        root.after(100, poll_job)
+
     def do_summarize():
         notes = notes_entry.get("1.0", tk.END).strip()
         if notes:
             summary_label.config(text="Summarizing...", fg="grey")
-            root.update_idletasks()
-            try:
-                from summarizer import summarize_notes
-                summary = summarize_notes(notes)
-                summary_label.config(text=summary, fg="#FFD580")
-            except ModuleNotFoundError:
-                summary_label.config(text="summarizer.py not found. Place it next to main.py", fg="red")
-            except Exception as e:
-                summary_label.config(text=f"Error: {e}", fg="red")
+            save_notes()
+            mode = mode_var.get()
+            if mode == "abstractive":
+                show_warmup_summary(notes)
+            already_polling = job_state["job"] is not None
+            # submitting replaces (and cancels) any job that is still running; saved
+            # per-paragraph summaries mean only edited paragraphs are summarized again
+            job_state["job"] = get_summary_worker().submit(notes, mode=mode, store=notes_store)
+            cancel_btn.config(state="normal")
+            if not already_polling:
+                root.after(100, poll_job)
         else:
             summary_label.config(text="Please enter some notes!", fg="red")
 
+    def show_warmup_summary(notes):
+        # while t5 is still loading, show a fast extractive summary in the meantime
+        try:
+            import summarizer
+            if summarizer.model.loaded:
+                return
+            quick = summarizer.summarize_extractive(notes)
+        except Exception:
+            return
+        summary_label.config(text=f"Quick summary while the model warms up:\n\n{quick}", fg="grey")
+
+    def do_cancel():
+        if job_state["job"] is not None:
+            get_summary_worker().cancel(job_state["job"])
+            summary_label.config(text="Cancelling...", fg="grey")
+            cancel_btn.config(state="disabled")
+
     summarize_btn = tk.Button(main_area, text="Summarize Notes", command=do_summarize,
                               bg=accent, fg="white", font=("Segoe UI", 12, "bold"))
     summarize_btn.place(x=60, y=330)
 
+    cancel_btn = tk.Button(main_area, text="Cancel", command=do_cancel, state="disabled",
+                           bg="#6c757d", fg="white", font=("Segoe UI", 12, "bold"))
+    cancel_btn.place(x=230, y=330)
+
+    for i, (label, value) in enumerate([("Fast", "fast"), ("Abstractive", "abstractive")]):
+        tk.Radiobutton(main_area, text=label, variable=mode_var, value=value, font=("Segoe UI", 11),
+                       bg=bg_gradient_top, fg="#FFD580", selectcolor=bg_gradient_top,
+                       activebackground=bg_gradient_top).place(x=330 + i * 80, y=333)
+
 
 # --- Planner (tasks) UI ---
 def show_planner():
@@ -541,8 +660,33 @@ for idx, (txt, cmd) in enumerate(sidebar_features):
 # --- Start with Home Screen ---
 show_home()
 
+
+def preload_summarizer():
+    try:
+        import summarizer
+        summarizer.model.preload()
+    except Exception:
+        # the Notes screen reports summarizer problems when it is actually used
+        traceback.print_exc()
+
+
+if PRELOAD_SUMMARIZER:
+    root.after_idle(lambda: root.after(500, preload_summarizer))
+
 # Bind event for other modules to return home (safe: show_home exists now)
 main_area.bind("<<SHOW_HOME>>", lambda e: show_home())
 
+
+def on_close():
+    run_leave_hooks()
+    root.destroy()
+
+
+root.protocol("WM_DELETE_WINDOW", on_close)
+
 # --- Mainloop ---
 root.mainloop()
+
+# stop any summary still running so the interpreter can exit promptly
+if summary_worker is not None:
+    summary_worker.shutdown()
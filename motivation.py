@@ -7,34 +7,17 @@ Usage:
 """
 
 import json
-import random
-from pathlib import Path
 import tkinter as tk
 from tkinter import messagebox
 
-BASE_DIR = Path(__file__).parent
-QUOTES_FILE = BASE_DIR / "motivate_quotes.json"
-
-_SAMPLE_QUOTES = [
-    "Success is not final; failure is not fatal: It is the courage to continue that counts.",
-    "Don’t watch the clock; do what it does. Keep going.",
-    "The secret of getting ahead is getting started.",
-    "Believe you can and you're halfway there.",
-    "Your limitation—it’s only your imagination.",
-    "Push yourself, because no one else is going to do it for you."
-]
+from quote_service import QUOTES_FILE, SAMPLE_QUOTES as _SAMPLE_QUOTES, shared_quotes
 
 
 def load_quotes():
+    # the shared quote service keeps the file in memory and re-reads it only
+    # when it has changed; the home screen deals from the same quotes
     try:
-        if not QUOTES_FILE.exists():
-            with QUOTES_FILE.open("w", encoding="utf-8") as fh:
-                json.dump(_SAMPLE_QUOTES, fh, indent=2, ensure_ascii=False)
-        with QUOTES_FILE.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-            if not isinstance(data, list):
-                raise ValueError("Quotes file malformed (expected list).")
-            return [str(q) for q in data if str(q).strip()]
+        return list(shared_quotes().refresh().quotes)
     except Exception as e:
         messagebox.showerror("Quotes Load Error", f"Could not load quotes:\n{e}")
         return _SAMPLE_QUOTES.copy()
@@ -44,6 +27,7 @@ def save_quotes(quotes):
     try:
         with QUOTES_FILE.open("w", encoding="utf-8") as fh:
             json.dump(quotes, fh, indent=2, ensure_ascii=False)
+        shared_quotes().replace(quotes)
     except Exception as e:
         messagebox.showerror("Quotes Save Error", str(e))
 
@@ -70,7 +54,7 @@ def launch_motivate(parent_frame):
     title.place(relx=0.5, y=20, anchor="center")
 
     # Quote display
-    quote_var = tk.StringVar(master=parent_frame, value=random.choice(quotes))
+    quote_var = tk.StringVar(master=parent_frame, value=shared_quotes().next() or "")
     quote_lbl = tk.Label(parent_frame, textvariable=quote_var, font=("Segoe UI", 16, "italic"),
                          wraplength=700, justify="center", bg=parent_frame.cget("bg"), fg="#FFF6E0")
     quote_lbl.place(relx=0.5, rely=0.35, anchor="center")
@@ -80,7 +64,7 @@ def launch_motivate(parent_frame):
         if not quotes:
             quote_var.set("Add some quotes below to get started!")
             return
-        quote_var.set(random.choice(quotes))
+        quote_var.set(shared_quotes().next())
 
     insp_btn = tk.Button(parent_frame, text="Inspire Me", command=inspire,
                          bg="#F28C28", fg="white", font=("Segoe UI", 12, "bold"), width=16)
@@ -142,7 +126,7 @@ def launch_motivate(parent_frame):
             refresh_list()
             # if the displayed quote was the removed one, replace
             if quote_var.get() == removed:
-                quote_var.set(random.choice(quotes) if quotes else "Add some quotes below to get started!")
+                quote_var.set(shared_quotes().next() if quotes else "Add some quotes below to get started!")
         except Exception as e:
             messagebox.showerror("Delete Error", str(e))
 
@@ -0,0 +1,73 @@
+"""
+notes_store.py
+
+Usage:
+    from notes_store import NotesStore
+    store = NotesStore()
+    text = store.load_text()
+    store.save_text(text)
+
+Persists the Notes screen: the notes text itself (notes.txt) and one summary per
+paragraph (notes_summaries.json), keyed by a hash of the paragraph's content so
+that only edited paragraphs need to be summarized again. The same file holds
+the summaries of groups of paragraph summaries from the reduce step, keyed
+"group:<hash of the members' keys>".
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+NOTES_FILE = BASE_DIR / "notes.txt"
+PARAGRAPH_SUMMARIES_FILE = BASE_DIR / "notes_summaries.json"
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def split_paragraphs(text):
+    return [p.strip() for p in _PARAGRAPH_RE.split(text) if p.strip()]
+
+
+def paragraph_hash(paragraph):
+    # whitespace-only edits should not invalidate a paragraph's summary
+    return hashlib.sha1(" ".join(paragraph.split()).encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+class NotesStore:
+    def __init__(self, notes_file=NOTES_FILE, summaries_file=PARAGRAPH_SUMMARIES_FILE):
+        self.notes_file = Path(notes_file)
+        self.summaries_file = Path(summaries_file)
+
+    def load_text(self):
+        if not self.notes_file.exists():
+            return ""
+        return self.notes_file.read_text(encoding="utf-8")
+
+    def save_text(self, text):
+        _write_atomic(self.notes_file, text)
+
+    def load_summaries(self, model_label):
+        """Paragraph hash -> summary, or {} if the file is missing or was made by another model."""
+        try:
+            with self.summaries_file.open("r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("model") != model_label:
+            return {}
+        paragraphs = data.get("paragraphs", {})
+        return paragraphs if isinstance(paragraphs, dict) else {}
+
+    def save_summaries(self, model_label, summaries):
+        _write_atomic(self.summaries_file,
+                      json.dumps({"model": model_label, "paragraphs": summaries}, indent=2, ensure_ascii=False))
@@ -6,22 +6,61 @@ Usage:
     # in your main.py, call launch_qa(main_area)
 
 Features:
-- Loads QA pairs from qa_questions.json (creates with samples if missing).
+- Loads QA pairs from qa_questions.json (creates with samples if missing); new
+  pairs are appended to a journal (qa_questions.journal) instead of rewriting the
+  whole file, and folded back into the JSON in the background (qa_store.py).
 - Lets the user ask a question, searches the local QA database for best matches,
   shows answers, and allows adding a new Q&A pair when an answer isn't found.
-- Simple, dependency-free fuzzy match (word overlap / substring scoring).
+- Simple, dependency-free BM25 ranking (question + tags, plus answer substrings),
+  served from an inverted index (qa_index.py) built once when the bank is loaded,
+  or from an SQLite FTS5 database for very large banks (QA_BACKEND=sqlite).
+- Live suggestions while typing (debounced, refined keystroke by keystroke).
+- Misspelt words ("pyhton") are corrected before searching; the status line says so.
+- "View All" is a virtual list (only visible rows exist, loaded page by page)
+  with a filter box backed by the search index, so huge banks open instantly.
+- Optional "Meaning" mode finds paraphrases through an offline LSA index
+  (qa_semantic.py, needs numpy), built in the background when first switched on.
 - All tkinter variables/widgets are created with parent_frame as master so it's safe
   to lazy-import and use inside your existing main GUI.
 """
 
-import json
-import math
+import os
+import sys
+import threading
+import time
 from pathlib import Path
 import tkinter as tk
+from tkinter import font as tkfont
 from tkinter import messagebox, simpledialog
 
+from qa_index import AnswerIndex, QAIndex, QueryCache
+from qa_semantic import LSAIndex
+from qa_store import JournalQAStore, SqliteQAStore
+
 BASE_DIR = Path(__file__).parent
 QA_FILE = BASE_DIR / "qa_questions.json"
+QA_DB_FILE = BASE_DIR / "qa_questions.sqlite3"
+# trigram index over the answers in QA_FILE, rebuilt whenever QA_FILE changes
+QA_ANSWER_INDEX_FILE = BASE_DIR / "qa_questions.answers.idx"
+# compiled, memory-mapped copy of QA_FILE's pairs (bank_cache.py), rebuilt whenever QA_FILE changes
+QA_BANK_CACHE_FILE = BASE_DIR / "qa_questions.json.bank"
+
+# "json": whole bank in memory (qa_index.py); "sqlite": SQLite FTS5 database for
+# very large banks, migrated from QA_FILE on first use. Override with QA_BACKEND.
+QA_BACKENDS = ("json", "sqlite")
+QA_BACKEND = os.environ.get("QA_BACKEND", "json").lower()
+
+MAX_MATCHES = 5
+LIVE_SEARCH_DELAY_MS = 80
+# searches remembered per Q&A session (bench_qa.py reports the hit rate for a size)
+QUERY_CACHE_SIZE = 256
+
+# "View All": pairs are fetched VIEW_ALL_PAGE_SIZE at a time as the list scrolls,
+# and the filter box shows at most VIEW_ALL_FILTER_LIMIT best matches
+VIEW_ALL_PAGE_SIZE = 200
+VIEW_ALL_CACHED_PAGES = 8
+VIEW_ALL_FILTER_LIMIT = 1000
+VIEW_ALL_FILTER_DELAY_MS = 150
 
 _SAMPLE_QA = [
     {
@@ -42,38 +81,62 @@ _SAMPLE_QA = [
 ]
 
 
-def load_qa():
+def load_qa(backend=None):
+    """
+    Open the QA bank. Returns (index, store): index answers searches and
+    index.get(idx) fetches a pair, store persists new pairs. With the json
+    backend the bank (snapshot + journal, see qa_store.py) is loaded into a
+    QAIndex; with the sqlite backend one SqliteQAStore plays both roles.
+    """
+    backend = (backend or QA_BACKEND).lower()
+    if backend not in QA_BACKENDS:
+        # a typo in the environment must not keep the Q&A screen from opening
+        print(f"qa: unknown QA_BACKEND {backend!r}, expected one of {QA_BACKENDS}; using json", file=sys.stderr)
+        backend = "json"
+    if backend == "sqlite":
+        bank = SqliteQAStore(QA_DB_FILE, QA_FILE)
+        try:
+            bank.load(_SAMPLE_QA)
+        except Exception as e:
+            messagebox.showerror("QA Load Error", f"Could not open QA database:\n{e}")
+            bank.close()  # fall back to the JSON bank
+        else:
+            return bank, bank
+
+    store = JournalQAStore(QA_FILE, cache_file=QA_BANK_CACHE_FILE)
     try:
-        if not QA_FILE.exists():
-            with QA_FILE.open("w", encoding="utf-8") as fh:
-                json.dump(_SAMPLE_QA, fh, indent=2, ensure_ascii=False)
-        with QA_FILE.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-            # Normalize shape
-            qa = []
-            for item in data:
-                if not isinstance(item, dict):
-                    continue
-                q = str(item.get("question", "")).strip()
-                a = str(item.get("answer", "")).strip()
-                tags = item.get("tags", [])
-                if not isinstance(tags, list):
-                    tags = []
-                tags = [str(t).strip().lower() for t in tags if str(t).strip()]
-                if q and a:
-                    qa.append({"question": q, "answer": a, "tags": tags})
-            return qa
+        qa_list = store.load(_SAMPLE_QA)
     except Exception as e:
         messagebox.showerror("QA Load Error", f"Could not load QA file:\n{e}")
-        return _SAMPLE_QA.copy()
-
-
-def save_qa(qa_list):
+        qa_list = store.items = [dict(item) for item in _SAMPLE_QA]
+        return QAIndex(qa_list), store
+
+    answers = AnswerIndex.load(QA_ANSWER_INDEX_FILE, store.snapshot_signature, store.snapshot_count)
+    # with a saved index only the pairs journaled since the snapshot are indexed now
+    index = QAIndex(qa_list, answers)
+    if answers is None:
+        try:
+            index.answers.save(QA_ANSWER_INDEX_FILE, store.snapshot_signature, store.snapshot_count)
+        except OSError:
+            pass  # only a cache; it is rebuilt next time
+    return index, store
+
+
+def save_qa(store, item):
+    """Append one new pair to the bank's journal; returns False if it could not be saved."""
     try:
-        with QA_FILE.open("w", encoding="utf-8") as fh:
-            json.dump(qa_list, fh, indent=2, ensure_ascii=False)
+        store.add(item)
+        return True
     except Exception as e:
         messagebox.showerror("QA Save Error", str(e))
+        return False
+
+
+def _describe_fixes(fixes):
+    # status-line note for words correct_query replaced, e.g. " (searched for python instead of pyhton)"
+    if not fixes:
+        return ""
+    return " (searched for " + ", ".join(f"{right} instead of {wrong}" for wrong, right in fixes) + ")"
 
 
 def _clear_frame(frame):
@@ -81,31 +144,13 @@ def _clear_frame(frame):
         w.destroy()
 
 
-def _tokenize(text):
-    # simple whitespace + punctuation split; lowercased
-    return [t for t in "".join((c if c.isalnum() else " ") for c in text.lower()).split() if t]
-
-
-def _score_query_against_text(query_tokens, text_tokens):
-    # Score based on overlap ratio and substring presence
-    if not query_tokens or not text_tokens:
-        return 0.0
-    set_q = set(query_tokens)
-    set_t = set(text_tokens)
-    overlap = len(set_q & set_t)
-    # basic overlap score normalized
-    overlap_score = overlap / max(len(set_q), 1)
-    # substring bonus: if full query appears in text (as substring)
-    substring_bonus = 0.5 if " ".join(query_tokens) in " ".join(text_tokens) else 0.0
-    return overlap_score + substring_bonus
-
-
 def launch_qa(parent_frame):
     """
     Render the Q&A UI inside parent_frame. Call as:
         launch_qa(main_area)
     """
-    qa_list = load_qa()
+    index, store = load_qa()
+    query_cache = QueryCache(index, QUERY_CACHE_SIZE)
 
     _clear_frame(parent_frame)
 
@@ -113,13 +158,24 @@ def launch_qa(parent_frame):
                      bg=parent_frame.cget("bg"), fg="#F28C28")
     title.place(relx=0.5, y=20, anchor="center")
 
-    instr = tk.Label(parent_frame, text="Ask a question (type here) and press Search:",
+    instr = tk.Label(parent_frame, text="Ask a question (matches appear as you type) and press Search:",
                      font=("Segoe UI", 11), bg=parent_frame.cget("bg"), fg="#FFF6E0")
     instr.place(x=40, y=70)
 
     query_entry = tk.Entry(parent_frame, width=70, font=("Segoe UI", 12), bd=2)
     query_entry.place(x=40, y=100)
 
+    completions_var = tk.StringVar(master=parent_frame, value="")
+    completions_lbl = tk.Label(parent_frame, textvariable=completions_var, font=("Segoe UI", 9),
+                               bg=parent_frame.cget("bg"), fg="#AAA")
+    completions_lbl.place(x=40, y=132)
+
+    semantic_var = tk.BooleanVar(master=parent_frame, value=False)
+    semantic_chk = tk.Checkbutton(parent_frame, text="Search by meaning", variable=semantic_var,
+                                  font=("Segoe UI", 9), bg=parent_frame.cget("bg"), fg="#AAA",
+                                  selectcolor="#222", activebackground=parent_frame.cget("bg"))
+    semantic_chk.place(x=600, y=130)
+
     result_frame = tk.Frame(parent_frame, bg=parent_frame.cget("bg"))
     result_frame.place(x=40, y=160, width=700, height=360)
 
@@ -143,77 +199,156 @@ def launch_qa(parent_frame):
                           bg=parent_frame.cget("bg"), fg="#FFD580")
     status_lbl.place(relx=0.5, y=540, anchor="center")
 
-    def render_matches(matches):
+    # a fixed pool of result rows, created once and updated in place, so that
+    # live suggestions do not rebuild widgets on every keystroke
+    match_rows = []
+    for _ in range(MAX_MATCHES):
+        row = tk.Frame(matches_list_frame, bg=parent_frame.cget("bg"))
+        q_label = tk.Label(row, font=("Segoe UI", 11, "bold"),
+                           bg=parent_frame.cget("bg"), fg="#FFF6E0", anchor="w", justify="left", wraplength=560)
+        q_label.pack(side="left", padx=(0,8))
+        btn = tk.Button(row, text="View Answer", width=12,
+                        bg="#FFD580", fg="#333", font=("Segoe UI", 10, "bold"))
+        btn.pack(side="left", padx=(8,0))
+        sc_lbl = tk.Label(row, font=("Segoe UI", 10), bg=parent_frame.cget("bg"), fg="#AAA")
+        sc_lbl.pack(side="right")
+        match_rows.append((row, q_label, btn, sc_lbl))
+    no_match_lbl = tk.Label(matches_list_frame, text="No matches found. You can add this question to the database.",
+                            bg=parent_frame.cget("bg"), fg="#FF6E6B", font=("Segoe UI", 11))
+
+    def render_matches(matches, empty_message=True):
         # matches: list of (score, qa_index)
-        for w in matches_list_frame.winfo_children():
-            w.destroy()
+        no_match_lbl.pack_forget()
+        for row, _, _, _ in match_rows:
+            row.pack_forget()
 
         if not matches:
-            tk.Label(matches_list_frame, text="No matches found. You can add this question to the database.",
-                     bg=parent_frame.cget("bg"), fg="#FF6E6B", font=("Segoe UI", 11)).pack(anchor="w")
+            if empty_message:
+                no_match_lbl.pack(anchor="w")
             return
 
-        for score, idx in matches:
-            qobj = qa_list[idx]
-            row = tk.Frame(matches_list_frame, bg=parent_frame.cget("bg"))
+        for (score, idx), (row, q_label, btn, sc_lbl) in zip(matches, match_rows):
+            q_label.config(text=f"Q: {index.get(idx)['question']}")
+            btn.config(command=lambda i=idx: show_answer(i))
+            sc_lbl.config(text=f"{score:.2f}")
             row.pack(fill="x", pady=4, anchor="w")
 
-            q_label = tk.Label(row, text=f"Q: {qobj['question']}", font=("Segoe UI", 11, "bold"),
-                               bg=parent_frame.cget("bg"), fg="#FFF6E0", anchor="w", justify="left", wraplength=560)
-            q_label.pack(side="left", padx=(0,8))
-
-            btn = tk.Button(row, text="View Answer", width=12,
-                            command=lambda i=idx: show_answer(i),
-                            bg="#FFD580", fg="#333", font=("Segoe UI", 10, "bold"))
-            btn.pack(side="left", padx=(8,0))
-
-            sc_lbl = tk.Label(row, text=f"{score:.2f}", font=("Segoe UI", 10),
-                              bg=parent_frame.cget("bg"), fg="#AAA")
-            sc_lbl.pack(side="right")
-
     def show_answer(idx):
+        item = index.get(idx)
         answer_text.delete("1.0", tk.END)
-        answer_text.insert(tk.END, qa_list[idx]["answer"])
-        status_var.set(f"Showing answer for: {qa_list[idx]['question']}")
+        answer_text.insert(tk.END, item["answer"])
+        status_var.set(f"Showing answer for: {item['question']}")
 
     def on_search():
         q = query_entry.get().strip()
         if not q:
             messagebox.showwarning("Empty", "Please type a question first.")
             return
-        status_var.set("Searching...")
-        parent_frame.update_idletasks()
-
-        q_toks = _tokenize(q)
-        scored = []
-        for i, item in enumerate(qa_list):
-            text_toks = _tokenize(item["question"] + " " + " ".join(item.get("tags", [])))
-            score = _score_query_against_text(q_toks, text_toks)
-            # small boost if any tag equals a query token
-            if any(t in q_toks for t in item.get("tags", [])):
-                score += 0.25
-            if score > 0:
-                scored.append((score, i))
-        # also include substring matches in answers (lower priority)
-        for i, item in enumerate(qa_list):
-            if q.lower() in item["answer"].lower():
-                scored.append((0.15, i))
-
-        # deduplicate by taking max score per index
-        best = {}
-        for sc, idx in scored:
-            best[idx] = max(best.get(idx, 0.0), sc)
-        scored_list = sorted(((s, i) for i, s in best.items()), key=lambda x: x[0], reverse=True)
+        cancel_live_search()
+        typed = q
+        q, fixes = index.correct_query(q)
+        note = _describe_fixes(fixes)
+        if semantic_var.get() and semantic["index"] is not None:
+            scored_list = semantic["index"].search(q, limit=MAX_MATCHES)
+            note += " (by meaning)"
+        else:
+            if semantic_var.get():
+                note += " Meaning search is still getting ready; these are keyword matches."
+            # answers are searched for what was typed, not the corrected words
+            scored_list = query_cache.search(q, limit=MAX_MATCHES, substring=typed)
 
         if scored_list:
-            # show top 5
-            render_matches(scored_list[:5])
-            status_var.set(f"Found {len(scored_list)} match(es). Showing top {min(5, len(scored_list))}.")
+            render_matches(scored_list)
+            status_var.set(f"Showing top {len(scored_list)} match(es).{note}")
             # auto-show top answer
             show_answer(scored_list[0][1])
         else:
             render_matches([])
-            status_var.set("No good match found.")
+            status_var.set(f"No good match found.{note}")
+
+    # --- semantic (LSA) search ---
+    semantic = {"index": None, "thread": None, "result": None}
+
+    def semantic_sync():
+        # fold in pairs added since the LSA index was built, keeping ids aligned with the bank
+        lsa = semantic["index"]
+        for i in range(len(lsa), len(index)):
+            lsa.add(index.get(i))
+
+    def build_semantic():
+        try:
+            semantic["result"] = LSAIndex(index.iter_pairs())
+        except Exception as e:  # numpy missing, or the build failed
+            semantic["result"] = e
+
+    def poll_semantic():
+        if not semantic_chk.winfo_exists():
+            return  # the user left the Q&A screen
+        if semantic["thread"].is_alive():
+            parent_frame.after(200, poll_semantic)
+            return
+        result, semantic["thread"] = semantic["result"], None
+        if isinstance(result, Exception):
+            semantic_var.set(False)
+            hint = "\n\nInstall numpy to use it: pip install numpy" if isinstance(result, ImportError) else ""
+            messagebox.showerror("Meaning Search", f"Could not build the meaning index:\n{result}{hint}")
+            status_var.set("")
+            return
+        semantic["index"] = result
+        semantic_sync()
+        status_var.set(f"Meaning search ready ({len(result)} pairs).")
+
+    def on_semantic_toggle():
+        if not semantic_var.get() or semantic["index"] is not None or semantic["thread"] is not None:
+            return
+        status_var.set("Building the meaning index in the background...")
+        semantic["thread"] = threading.Thread(target=build_semantic, name="qa-lsa", daemon=True)
+        semantic["thread"].start()
+        parent_frame.after(200, poll_semantic)
+
+    semantic_chk.config(command=on_semantic_toggle)
+
+    # --- search-as-you-type ---
+    live = {"after_id": None, "previous": None}
+    open_views = []     # refresh callbacks of open "View All" popups
+
+    def cancel_live_search():
+        if live["after_id"] is not None:
+            parent_frame.after_cancel(live["after_id"])
+            live["after_id"] = None
+
+    def on_key(event):
+        if event.keysym in ("Return", "KP_Enter"):
+            return
+        # debounce: only search once typing pauses briefly
+        cancel_live_search()
+        live["after_id"] = parent_frame.after(LIVE_SEARCH_DELAY_MS, live_search)
+
+    def live_search():
+        live["after_id"] = None
+        text = query_entry.get().lstrip()
+        if not text.strip():
+            live["previous"] = None
+            completions_var.set("")
+            render_matches([], empty_message=False)
+            return
+        t0 = time.perf_counter()
+        text, fixes = index.correct_query(text, partial=True)
+        result = index.prefix_search(text, previous=live["previous"], limit=MAX_MATCHES)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        live["previous"] = result
+
+        words = result.completions[:6]
+        completions_var.set("Suggestions: " + " · ".join(words) if words else "")
+        render_matches(result.ranked, empty_message=not result.truncated)
+        if result.truncated:
+            status_var.set("Keep typing to narrow the suggestions...")
+        else:
+            status_var.set(f"{len(result.candidates)} live match(es) ({elapsed_ms:.1f} ms)."
+                           f"{_describe_fixes(fixes)} Press Enter to search.")
+
+    query_entry.bind("<KeyRelease>", on_key)
+    query_entry.bind("<Return>", lambda e: on_search())
 
     def add_current_as_pair():
         q = query_entry.get().strip()
@@ -228,23 +363,177 @@ def launch_qa(parent_frame):
         tags = []
         if tags_input:
             tags = [t.strip().lower() for t in tags_input.split(",") if t.strip()]
-        qa_list.append({"question": q, "answer": ans.strip(), "tags": tags})
-        save_qa(qa_list)
+        item = {"question": q, "answer": ans.strip(), "tags": tags}
+        if not save_qa(store, item):
+            return
+        index.sync()
+        query_cache.invalidate()
+        if semantic["index"] is not None:
+            semantic_sync()
+        live["previous"] = None  # cached live candidates do not include the new pair
+        for refresh_view in open_views:
+            refresh_view()
         messagebox.showinfo("Saved", "New Q&A pair has been saved.")
         status_var.set("Saved new Q&A pair.")
         # refresh search results by re-running search
         on_search()
 
     def show_all_entries():
-        # simple viewer of all QA pairs
+        # virtualized viewer of all QA pairs: the listbox only ever holds the rows
+        # on screen, fetched a page at a time as the user scrolls
         popup = tk.Toplevel(master=parent_frame)
         popup.title("All Q&A")
         popup.geometry("700x500")
-        listbox = tk.Listbox(popup, width=100, height=25)
-        listbox.pack(fill="both", expand=True, padx=10, pady=10)
-        for i, item in enumerate(qa_list):
-            display = f"{i+1}. Q: {item['question']}  —  A: {item['answer'][:120]}{'...' if len(item['answer'])>120 else ''}"
-            listbox.insert(tk.END, display)
+
+        filter_entry = tk.Entry(popup, font=("Segoe UI", 11))
+        filter_entry.pack(fill="x", padx=10, pady=(10, 0))
+        count_var = tk.StringVar(master=popup, value="")
+        tk.Label(popup, textvariable=count_var, font=("Segoe UI", 9), fg="#666").pack(anchor="w", padx=10)
+
+        body = tk.Frame(popup)
+        body.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        scrollbar = tk.Scrollbar(body, orient="vertical")
+        scrollbar.pack(side="right", fill="y")
+        listbox = tk.Listbox(body, width=100, height=25, activestyle="none")
+        listbox.pack(side="left", fill="both", expand=True)
+        line_height = tkfont.Font(font=listbox.cget("font")).metrics("linespace") + 1
+
+        # ids: None for the whole bank in order, else the filtered pair ids
+        # selected: position of the selected row in the whole list (not just on screen)
+        view = {"ids": None, "total": len(index), "top": 0, "rows": 25, "shown": [],
+                "pages": {}, "after_id": None, "selected": None}
+
+        def pair_at(idx):
+            if view["ids"] is not None:
+                return index.get(idx)
+            page_no = idx // VIEW_ALL_PAGE_SIZE
+            page = view["pages"].get(page_no)
+            if page is None:
+                if len(view["pages"]) >= VIEW_ALL_CACHED_PAGES:
+                    view["pages"].clear()
+                page = view["pages"][page_no] = dict(index.page(page_no * VIEW_ALL_PAGE_SIZE, VIEW_ALL_PAGE_SIZE))
+            return page[idx]
+
+        def render():
+            total, rows = view["total"], view["rows"]
+            top = view["top"] = max(0, min(view["top"], total - rows))
+            stop = min(total, top + rows)
+            view["shown"] = list(range(top, stop)) if view["ids"] is None else view["ids"][top:stop]
+            listbox.delete(0, tk.END)
+            for idx in view["shown"]:
+                item = pair_at(idx)
+                display = f"{idx+1}. Q: {item['question']}  —  A: {item['answer'][:120]}{'...' if len(item['answer'])>120 else ''}"
+                listbox.insert(tk.END, display)
+            sel = view["selected"]
+            if sel is not None and top <= sel < stop:
+                listbox.selection_set(sel - top)
+                listbox.activate(sel - top)
+            if total:
+                scrollbar.set(top / total, stop / total)
+            else:
+                scrollbar.set(0.0, 1.0)
+
+        def scroll_to(top):
+            if top != view["top"]:
+                view["top"] = top
+                render()
+
+        def on_scrollbar(action, amount, unit=None):
+            if action == "moveto":
+                scroll_to(int(float(amount) * view["total"]))
+            elif action == "scroll":
+                step = view["rows"] if unit == "pages" else 1
+                scroll_to(view["top"] + int(amount) * step)
+
+        def on_wheel(event):
+            if getattr(event, "num", None) == 4 or event.delta > 0:
+                scroll_to(view["top"] - 3)
+            else:
+                scroll_to(view["top"] + 3)
+            return "break"
+
+        def on_resize(event):
+            rows = max(1, event.height // line_height)
+            if rows != view["rows"]:
+                view["rows"] = rows
+                render()
+
+        def apply_filter(keep_position=False):
+            view["after_id"] = None
+            text = filter_entry.get().strip()
+            if text:
+                view["ids"] = [idx for _, idx in index.search(text, limit=VIEW_ALL_FILTER_LIMIT)]
+                view["total"] = len(view["ids"])
+                more = " (best matches only)" if view["total"] == VIEW_ALL_FILTER_LIMIT else ""
+                count_var.set(f"{view['total']} matching pair(s){more}")
+            else:
+                view["ids"], view["total"] = None, len(index)
+                count_var.set(f"{view['total']} pair(s)")
+            if not keep_position:
+                view["top"], view["selected"] = 0, None
+            elif view["selected"] is not None and view["selected"] >= view["total"]:
+                view["selected"] = None
+            render()
+
+        def refresh():
+            # a pair was added: recount, re-filter and re-read pages, staying in place
+            view["pages"].clear()
+            apply_filter(keep_position=True)
+
+        def on_filter_key(event):
+            if view["after_id"] is not None:
+                popup.after_cancel(view["after_id"])
+            view["after_id"] = popup.after(VIEW_ALL_FILTER_DELAY_MS, apply_filter)
+
+        def on_select(event):
+            sel = listbox.curselection()
+            if sel and sel[0] < len(view["shown"]):
+                view["selected"] = view["top"] + sel[0]
+
+        def move_selection(delta):
+            # keyboard navigation over the whole list: scroll the window along
+            if not view["total"]:
+                return "break"
+            sel = view["selected"]
+            if sel is None:
+                sel = view["top"] if delta > 0 else view["top"] + len(view["shown"]) - 1
+            else:
+                sel = max(0, min(view["total"] - 1, sel + delta))
+            view["selected"] = sel
+            if sel < view["top"]:
+                view["top"] = sel
+            elif sel >= view["top"] + view["rows"]:
+                view["top"] = sel - view["rows"] + 1
+            render()
+            return "break"
+
+        def on_open(event):
+            sel = listbox.curselection()
+            if sel and sel[0] < len(view["shown"]):
+                show_answer(view["shown"][sel[0]])
+
+        def on_close(event):
+            if event.widget is popup and refresh in open_views:
+                open_views.remove(refresh)
+
+        scrollbar.config(command=on_scrollbar)
+        listbox.bind("<Configure>", on_resize)
+        listbox.bind("<MouseWheel>", on_wheel)
+        listbox.bind("<Button-4>", on_wheel)
+        listbox.bind("<Button-5>", on_wheel)
+        listbox.bind("<Double-Button-1>", on_open)
+        listbox.bind("<Return>", on_open)
+        listbox.bind("<<ListboxSelect>>", on_select)
+        listbox.bind("<Up>", lambda e: move_selection(-1))
+        listbox.bind("<Down>", lambda e: move_selection(1))
+        listbox.bind("<Prior>", lambda e: move_selection(-view["rows"]))
+        listbox.bind("<Next>", lambda e: move_selection(view["rows"]))
+        listbox.bind("<Home>", lambda e: move_selection(-view["total"]))
+        listbox.bind("<End>", lambda e: move_selection(view["total"]))
+        filter_entry.bind("<KeyRelease>", on_filter_key)
+        popup.bind("<Destroy>", on_close)
+        open_views.append(refresh)
+        apply_filter()
 
     # Buttons
     search_btn = tk.Button(parent_frame, text="Search", command=on_search,
@@ -0,0 +1,477 @@
+"""
+qa_index.py
+
+Usage:
+    from qa_index import QAIndex
+    index = QAIndex(qa_list)
+    matches = index.search("how do i install pip")   # [(score, qa_index), ...] best first
+
+Search index for the Q&A bank (no tkinter, so it can be used headless).
+A token -> postings map is built once over each pair's question and tags and
+updated in place when pairs are added, so a query only scores the pairs that
+share at least one token with it instead of re-tokenizing the whole bank.
+
+Ranking is BM25 over two fields, question and tags, with tag matches weighted
+TAG_WEIGHT times a question match (BM25F-style). Postings are kept as compact
+parallel arrays of pair ids and weighted term frequencies, and scoring is one
+term-at-a-time accumulation over the postings of the query's terms.
+
+prefix_search() serves search-as-you-type: the last, unfinished word of the
+query is completed from a sorted vocabulary (PrefixIndex), and each keystroke
+that only extends the query narrows the previous candidate set instead of
+searching the whole bank again.
+
+Answers are searched for the raw query as a substring through a trigram index
+(AnswerIndex): only pairs whose answer contains every three-letter piece of the
+query are checked. The index can be saved next to the bank and reloaded while
+the bank file is unchanged.
+
+QueryCache memoizes search() results for repeated queries (students in one
+session ask the same few things) until a pair is added.
+
+correct_query() fixes misspelt query words ("pyhton" -> "python") against the
+indexed vocabulary with a SymSpell index (qa_spell.py) kept up to date as
+pairs are added.
+"""
+
+import bisect
+import heapq
+import marshal
+import math
+import os
+import re
+from array import array
+from collections import OrderedDict
+
+from qa_spell import SpellIndex, rewrite_query
+
+
+_WORD = re.compile(r"[^\W_]+")    # runs of str.isalnum() characters
+
+
+def tokenize(text):
+    # simple whitespace + punctuation split; lowercased
+    return _WORD.findall(text.lower())
+
+
+class PrefixIndex:
+    """
+    Vocabulary kept sorted so that all words sharing a prefix form one
+    contiguous range, found with two binary searches. This answers the same
+    prefix queries as a character trie at a fraction of the memory.
+    """
+
+    def __init__(self, words=()):
+        self._words = sorted(set(words))
+
+    def __len__(self):
+        return len(self._words)
+
+    def add(self, word):
+        i = bisect.bisect_left(self._words, word)
+        if i == len(self._words) or self._words[i] != word:
+            self._words.insert(i, word)
+
+    def _range(self, prefix):
+        return (bisect.bisect_left(self._words, prefix),
+                bisect.bisect_left(self._words, prefix + "\uffff"))
+
+    def count(self, prefix):
+        lo, hi = self._range(prefix)
+        return hi - lo
+
+    def complete(self, prefix, limit=None):
+        lo, hi = self._range(prefix)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return self._words[lo:hi]
+
+
+class PrefixResult:
+    """State of one prefix_search call; pass it back as previous= to refine."""
+
+    def __init__(self, text, complete, prefix, candidates, ranked, completions, truncated, filter_prefix=""):
+        self.text = text
+        self.complete = complete        # finished query words
+        self.prefix = prefix            # unfinished last word ("" after a space)
+        self.filter_prefix = filter_prefix  # prefix the candidates were filtered on, if any
+        self.candidates = candidates    # pair ids matching so far, or None if too broad
+        self.ranked = ranked            # [(score, idx), ...] best first
+        self.completions = completions  # vocabulary words completing prefix, most common first
+        self.truncated = truncated      # True when the query was too broad to rank
+
+
+class AnswerIndex:
+    """
+    Trigram -> sorted array of pair ids whose lowercased answer contains it.
+    A substring query can only occur in answers holding all of its trigrams,
+    so intersecting those postings (rarest first) leaves a few candidates to
+    check with `in`, instead of every answer in the bank.
+    """
+
+    N = 3
+    FORMAT_VERSION = 1
+
+    def __init__(self):
+        self.grams = {}
+        self.count = 0      # pairs 0..count-1 are indexed
+
+    def add(self, idx, text):
+        for gram in {text[i:i + self.N] for i in range(len(text) - self.N + 1)}:
+            ids = self.grams.get(gram)
+            if ids is None:
+                ids = self.grams[gram] = array("i")
+            ids.append(idx)
+        self.count = idx + 1
+
+    def candidates(self, text):
+        """Sorted ids that may contain text, or None if text is too short to narrow anything."""
+        if len(text) < self.N:
+            return None
+        postings = []
+        for gram in {text[i:i + self.N] for i in range(len(text) - self.N + 1)}:
+            ids = self.grams.get(gram)
+            if ids is None:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+        found = postings[0]
+        for ids in postings[1:]:
+            # postings are sorted, so membership is a binary search
+            found = [i for i in found if _contains_sorted(ids, i)]
+            if not found:
+                break
+        return found
+
+    # --- persistence ---
+    def save(self, path, signature, count):
+        """Write the postings of pairs 0..count-1, tagged with the bank file's signature."""
+        grams = {}
+        for gram, ids in self.grams.items():
+            end = bisect.bisect_left(ids, count)
+            if end:
+                grams[gram] = ids[:end].tobytes()
+        data = marshal.dumps({"version": self.FORMAT_VERSION, "signature": list(signature),
+                              "count": count, "grams": grams})
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, signature, count):
+        """The saved index if it was made from this exact bank file and covers count pairs, else None."""
+        try:
+            data = marshal.loads(path.read_bytes())
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        if (not isinstance(data, dict) or data.get("version") != cls.FORMAT_VERSION
+                or data.get("signature") != list(signature) or data.get("count") != count):
+            return None
+        index = cls()
+        for gram, raw in data["grams"].items():
+            ids = array("i")
+            ids.frombytes(raw)
+            index.grams[gram] = ids
+        index.count = count
+        return index
+
+
+def _contains_sorted(ids, value):
+    i = bisect.bisect_left(ids, value)
+    return i < len(ids) and ids[i] == value
+
+
+class QAIndex:
+    K1 = 1.2
+    B = 0.75
+    TAG_WEIGHT = 2.0
+    # pairs whose answer contains the raw query, but no indexed term, still show up
+    ANSWER_SCORE = 0.15
+    # search-as-you-type limits: shorter prefixes are not expanded, and candidate
+    # sets larger than this are not ranked until the user types something rarer
+    MIN_PREFIX = 2
+    MAX_COMPLETIONS = 50
+    MAX_LIVE_CANDIDATES = 5000
+
+    def __init__(self, qa_list, answers=None):
+        self.items = qa_list
+        # substring index over answers; a saved one only needs the pairs after it indexing
+        self.answers = answers if answers is not None else AnswerIndex()
+        self.postings = {}          # token -> (array of pair ids, array of weighted tf)
+        self._doc_len = array("f")  # weighted field length per pair
+        self._total_len = 0.0
+        self._answers = []          # per pair: lowercased answer
+        self._answer_vocab = set()  # every token of every answer, for correct_query
+        self._fields = []           # per pair: (question tokens, tag tokens)
+        self.vocab = PrefixIndex()
+        self._spell = None          # SpellIndex, built on the first query that needs it
+        for i in range(len(qa_list)):
+            self._index(i)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _index(self, idx):
+        item = self.items[idx]
+        tf = {}
+        q_toks = tokenize(item["question"])
+        for tok in q_toks:
+            tf[tok] = tf.get(tok, 0.0) + 1.0
+        t_toks = tokenize(" ".join(item.get("tags", [])))
+        for tok in t_toks:
+            tf[tok] = tf.get(tok, 0.0) + self.TAG_WEIGHT
+        for tok, freq in tf.items():
+            entry = self.postings.get(tok)
+            if entry is None:
+                entry = self.postings[tok] = (array("i"), array("f"))
+                self.vocab.add(tok)
+                if self._spell is not None:
+                    self._spell.add(tok)
+            entry[0].append(idx)
+            entry[1].append(freq)
+        length = len(q_toks) + self.TAG_WEIGHT * len(t_toks)
+        self._doc_len.append(length)
+        self._total_len += length
+        answer = item["answer"].lower()
+        self._answers.append(answer)
+        self._answer_vocab.update(tokenize(answer))
+        if idx >= self.answers.count:
+            self.answers.add(idx, answer)
+        self._fields.append((tuple(q_toks), tuple(t_toks)))
+
+    def add(self, item):
+        """Append item to the bank and index it; returns its index."""
+        self.items.append(item)
+        return self.sync()[-1]
+
+    def sync(self):
+        """Index pairs appended to self.items by someone else; returns their indices."""
+        new = list(range(len(self._doc_len), len(self.items)))
+        for idx in new:
+            self._index(idx)
+        return new
+
+    def df(self, token):
+        entry = self.postings.get(token)
+        return len(entry[0]) if entry else 0
+
+    def idf(self, token):
+        df = self.df(token)
+        n = len(self._doc_len)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    @property
+    def spell(self):
+        if self._spell is None:
+            self._spell = SpellIndex(self.postings)
+        return self._spell
+
+    def correct_query(self, query, partial=False):
+        """
+        Replace query words that are not in the index with their closest
+        indexed word. Words found in some answer are left alone: they are not
+        typos, and the answer substring pass can still find them. Returns
+        (query, [(wrong, right), ...]). Use partial=True while the user is
+        still typing the last word.
+        """
+        def fix(tok):
+            if tok in self.postings or tok in self._answer_vocab:
+                return None
+            return self.spell.correct(tok, self.df)
+        return rewrite_query(query, tokenize(query), fix, partial)
+
+    def score_terms(self, tokens):
+        """BM25 scores {pair index: score} for the given query tokens."""
+        n = len(self._doc_len)
+        if not n:
+            return {}
+        k1, b = self.K1, self.B
+        inv_avgdl = n / self._total_len if self._total_len else 0.0
+        doc_len = self._doc_len
+        scores = {}
+        for tok in set(tokens):
+            entry = self.postings.get(tok)
+            if entry is None:
+                continue
+            docs, tfs = entry
+            idf = self.idf(tok)
+            w = idf * (k1 + 1.0)
+            base = k1 * (1.0 - b)
+            scale = k1 * b * inv_avgdl
+            get = scores.get
+            for d, tf in zip(docs, tfs):
+                scores[d] = get(d, 0.0) + w * tf / (tf + base + scale * doc_len[d])
+        return scores
+
+    def get(self, idx):
+        return self.items[idx]
+
+    def iter_pairs(self):
+        """Every pair in bank order; safe to run on another thread while pairs are added."""
+        yield from self.items[:len(self._doc_len)]
+
+    def page(self, offset, limit):
+        """[(idx, pair), ...] for up to limit pairs starting at offset, in bank order."""
+        return list(enumerate(self.items[offset:offset + limit], start=offset))
+
+    def search(self, query, limit=None, offset=0, substring=None):
+        """
+        Return [(score, idx), ...] for matching pairs, best first (optionally
+        one page of them). substring is the text looked for in answers, when
+        it differs from query (e.g. the user's words before spelling correction).
+        """
+        best = self.score_terms(tokenize(query))
+
+        # also include substring matches in answers (lower priority)
+        q_lower = (query if substring is None else substring).lower()
+        candidates = self.answers.candidates(q_lower)
+        for idx in range(len(self._answers)) if candidates is None else candidates:
+            if idx not in best and q_lower in self._answers[idx]:
+                best[idx] = self.ANSWER_SCORE
+
+        scored = ((s, i) for i, s in best.items())
+        if limit is None:
+            return sorted(scored, key=lambda x: x[0], reverse=True)[offset:]
+        return heapq.nlargest(offset + limit, scored, key=lambda x: x[0])[offset:]
+
+    def _score_doc(self, idx, tokens, prefix):
+        # BM25 for one pair from its stored fields; the unfinished prefix counts
+        # as its best-scoring completion present in the pair
+        q_toks, t_toks = self._fields[idx]
+        n = len(self._doc_len)
+        norm = self.K1 * (1.0 - self.B + self.B * self._doc_len[idx] * n / self._total_len)
+
+        def term(tok):
+            tf = q_toks.count(tok) + self.TAG_WEIGHT * t_toks.count(tok)
+            return self.idf(tok) * tf * (self.K1 + 1.0) / (tf + norm) if tf else 0.0
+
+        score = sum(term(tok) for tok in tokens)
+        if prefix:
+            score += max((term(tok) for tok in set(q_toks + t_toks) if tok.startswith(prefix)), default=0.0)
+        return score
+
+    def _matches(self, idx, tokens, prefix):
+        q_toks, t_toks = self._fields[idx]
+        if any(tok not in q_toks and tok not in t_toks for tok in tokens):
+            return False
+        return not prefix or any(tok.startswith(prefix) for tok in q_toks + t_toks)
+
+    def prefix_search(self, text, previous=None, limit=5):
+        """
+        Search-as-you-type: every finished word must match (except very common
+        ones), and the last, unfinished word matches any indexed word it is a
+        prefix of. When text only extends previous.text, the previous candidates
+        are filtered instead of searching the bank again. Returns a PrefixResult.
+        """
+        toks = tokenize(text)
+        if toks and text[-1:].isalnum():
+            complete, prefix = toks[:-1], toks[-1]
+        else:
+            complete, prefix = toks, ""
+        completions = self.vocab.complete(prefix, self.MAX_COMPLETIONS) if len(prefix) >= self.MIN_PREFIX else []
+        completions.sort(key=self.df, reverse=True)
+
+        # words as common as "how" or "what" rank results but do not filter them
+        required = [tok for tok in complete if self.df(tok) <= self.MAX_LIVE_CANDIDATES]
+        if any(tok not in self.postings for tok in required):
+            # a finished word no question or tag contains: nothing can match
+            return PrefixResult(text, complete, prefix, [], [], completions, False)
+
+        base = None
+        if self._refines(previous, text, complete, prefix, required):
+            # only extended the query: matches for it are a subset of the previous ones
+            base = previous.candidates
+        elif required:
+            # start from the rarest finished word's postings
+            base = self.postings[min(required, key=self.df)][0]
+        elif completions and self.vocab.count(prefix) <= self.MAX_COMPLETIONS:
+            if sum(self.df(word) for word in completions) <= self.MAX_LIVE_CANDIDATES:
+                base = set()
+                for word in completions:
+                    base.update(self.postings[word][0])
+
+        if base is None or len(base) > self.MAX_LIVE_CANDIDATES:
+            return PrefixResult(text, complete, prefix, None, [], completions, truncated=bool(toks))
+        if len(prefix) < self.MIN_PREFIX:
+            # too short to filter on yet
+            filter_prefix = ""
+        else:
+            filter_prefix = prefix
+        candidates = [i for i in base if self._matches(i, required, filter_prefix)]
+        scored = ((self._score_doc(i, complete, filter_prefix), i) for i in candidates)
+        ranked = heapq.nlargest(limit, scored, key=lambda x: x[0])
+        return PrefixResult(text, complete, prefix, candidates, ranked, completions, False, filter_prefix)
+
+    @staticmethod
+    def _refines(previous, text, complete, prefix, required):
+        if previous is None or previous.candidates is None or not text.startswith(previous.text):
+            return False
+        if complete[:len(previous.complete)] != previous.complete:
+            return False
+        if not previous.filter_prefix:
+            return True
+        # the previous candidates all contain a word starting with filter_prefix;
+        # that only narrows the new query if that word still has to match
+        if len(complete) == len(previous.complete):
+            return prefix.startswith(previous.filter_prefix)
+        return complete[len(previous.complete)] in required
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of normalized query -> search results, in front of a
+    QAIndex or SqliteQAStore. BM25 scores depend on the number of pairs and
+    their average length, so any added pair can change every cached ranking:
+    the index size is part of the key, and invalidate() empties the cache.
+    """
+
+    def __init__(self, index, maxsize=256):
+        self.index = index
+        self.maxsize = maxsize
+        self._entries = OrderedDict()   # (index size, query, substring, limit, offset) -> results
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def normalize(query):
+        return " ".join(query.lower().split())
+
+    def search(self, query, limit=None, offset=0, substring=None):
+        q = self.normalize(query)
+        sub = self.normalize(substring) if substring is not None else None
+        if sub == q:
+            sub = None
+        # the size also catches pairs added behind the cache's back (another
+        # process writing the same SQLite store)
+        key = (len(self.index), q, sub, limit, offset)
+        results = self._entries.get(key)
+        if results is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(results)
+        self.misses += 1
+        results = self.index.search(q, limit=limit, offset=offset, substring=sub)
+        self._entries[key] = results
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return list(results)
+
+    def invalidate(self):
+        """
+        Forget every cached result after a pair is added or edited. This is
+        deliberately total: the change moves BM25's pair count and average
+        length, so any cached ranking may be off, not just those sharing a word.
+        """
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries), "maxsize": self.maxsize,
+                "invalidations": self.invalidations}
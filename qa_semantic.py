@@ -0,0 +1,229 @@
+"""
+qa_semantic.py
+
+Usage:
+    from qa_semantic import LSAIndex
+    lsa = LSAIndex(qa_list)                      # or any iterable of pairs
+    matches = lsa.search("how to add a library")  # [(cosine, qa_index), ...] best first
+
+Offline semantic search for the Q&A bank (no tkinter, no network, no model
+download; needs numpy, imported lazily). Each pair's question, tags and answer
+become a TF-IDF vector, and a truncated SVD of the whole bank (latent semantic
+analysis) maps those into DIMS dimensions where words used in similar pairs
+land close together, so "add a library" can find "install a package" without
+sharing a word with it.
+
+The pair vectors are kept as one float32 matrix. Banks with at least
+IVF_MIN_PAIRS pairs are also clustered (spherical k-means) into an inverted
+file: a query is only compared with the pairs in the N_PROBE clusters nearest
+to it, not the whole bank. Pairs added later are folded into the existing
+space (projected with the same vocabulary and SVD basis) and their nearest
+cluster, so the index grows without being rebuilt.
+"""
+
+import math
+
+from qa_index import tokenize
+
+DIMS = 100
+TAG_REPEAT = 2              # tags count as if they appeared this many times
+MAX_VOCAB = 100000
+IVF_MIN_PAIRS = 5000        # smaller banks are searched exhaustively
+N_PROBE = 8
+POWER_ITERATIONS = 1
+KMEANS_SAMPLE = 50000
+KMEANS_ITERATIONS = 8
+_CHUNK_NNZ = 500000         # bounds the temporary memory of sparse products
+
+
+def pair_tokens(item):
+    return tokenize(" ".join([item["question"]] + item.get("tags", []) * TAG_REPEAT + [item["answer"]]))
+
+
+def _spmm(np, indptr, indices, data, m):
+    """CSR matrix (indptr, indices, data) times dense m, in chunks of rows."""
+    n = len(indptr) - 1
+    out = np.zeros((n, m.shape[1]), dtype=np.float32)
+    start = 0
+    while start < n:
+        end = min(n, int(np.searchsorted(indptr, indptr[start] + _CHUNK_NNZ, side="right")) - 1)
+        end = max(end, start + 1)
+        lo, hi = indptr[start], indptr[end]
+        if hi > lo:
+            prod = data[lo:hi, None] * m[indices[lo:hi]]
+            offsets = indptr[start:end + 1] - lo
+            # reduceat sums each row's segment; empty rows are skipped (and stay 0)
+            # since reduceat would give them the next row's first value
+            rows = np.flatnonzero(np.diff(offsets))
+            out[start + rows] = np.add.reduceat(prod, offsets[rows], axis=0)
+        start = end
+    return out
+
+
+def _orthonormal(np, a):
+    q, _ = np.linalg.qr(a)
+    return q.astype(np.float32)
+
+
+class LSAIndex:
+    def __init__(self, pairs, dims=DIMS, seed=0):
+        import numpy as np
+        self._np = np
+        self._rng = np.random.default_rng(seed)
+
+        # pass 1: token ids per pair and document frequencies
+        vocab, df, docs = {}, [], []
+        for item in pairs:
+            counts = {}
+            for tok in pair_tokens(item):
+                tid = vocab.setdefault(tok, len(vocab))
+                if tid == len(df):
+                    df.append(0)
+                counts[tid] = counts.get(tid, 0) + 1
+            for tid in counts:
+                df[tid] += 1
+            docs.append(counts)
+        n = len(docs)
+        df = np.asarray(df, dtype=np.int64)
+
+        # keep the MAX_VOCAB most frequent words; words in only one pair say
+        # nothing about which words go together, so they are dropped on big banks
+        keep = np.argsort(-df, kind="stable")[:MAX_VOCAB]
+        if n > 1000:
+            keep = keep[df[keep] > 1]
+        remap = np.full(len(df), -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        words = list(vocab)
+        self.vocab = {words[old]: new for new, old in enumerate(keep.tolist())}
+        self.idf = (np.log((n + 1) / (df[keep] + 1)) + 1.0).astype(np.float32)
+
+        # pass 2: tf-idf rows in CSR form
+        indptr, indices, data = [0], [], []
+        for counts in docs:
+            cols = [int(remap[tid]) for tid in counts if remap[tid] >= 0]
+            indices.extend(cols)
+            data.extend(self._weights(cols, [counts[tid] for tid in counts if remap[tid] >= 0]))
+            indptr.append(len(indices))
+        del docs
+        indptr = np.asarray(indptr, dtype=np.int64)
+        indices = np.asarray(indices, dtype=np.int64)
+        data = np.asarray(data, dtype=np.float32)
+
+        self.dims = max(1, min(dims, n, len(keep)))
+        self._basis = self._svd(indptr, indices, data, n, len(keep))   # vocab x dims
+        vectors = _spmm(np, indptr, indices, data, self._basis) if n else np.zeros((0, self.dims), np.float32)
+        self._vectors = self._normalize(vectors)
+        self._n = n
+        self._centroids = None
+        self._lists = None
+        if n >= IVF_MIN_PAIRS:
+            self._build_ivf()
+
+    def __len__(self):
+        return self._n
+
+    # --- building ---
+    def _weights(self, cols, tfs):
+        w = [(1.0 + math.log(tf)) * float(self.idf[c]) for c, tf in zip(cols, tfs)]
+        norm = math.sqrt(sum(x * x for x in w)) or 1.0
+        return [x / norm for x in w]
+
+    def _normalize(self, vectors):
+        norms = self._np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / self._np.where(norms > 0, norms, 1.0)).astype(self._np.float32)
+
+    def _svd(self, indptr, indices, data, n, m):
+        """Right singular vectors of the n x m tf-idf matrix (randomized SVD, Halko et al.)."""
+        np = self._np
+        k = self.dims
+        if not n or not m:
+            return np.zeros((m, k), dtype=np.float32)
+        # transpose in CSR form, for products with X.T
+        order = np.argsort(indices, kind="stable")
+        rows = np.repeat(np.arange(n), np.diff(indptr))[order]
+        t_indptr = np.concatenate(([0], np.cumsum(np.bincount(indices, minlength=m))))
+        t_data = data[order]
+
+        sketch = min(m, n, k + 10)
+        q = _orthonormal(np, _spmm(np, indptr, indices, data,
+                                   self._rng.standard_normal((m, sketch), dtype=np.float32)))
+        for _ in range(POWER_ITERATIONS):  # sharpens the top of the spectrum
+            z = _orthonormal(np, _spmm(np, t_indptr, rows, t_data, q))
+            q = _orthonormal(np, _spmm(np, indptr, indices, data, z))
+        bt = _spmm(np, t_indptr, rows, t_data, q)        # (Q.T X).T, m x sketch
+        v, _, _ = np.linalg.svd(bt, full_matrices=False)
+        return np.ascontiguousarray(v[:, :k], dtype=np.float32)
+
+    def _build_ivf(self):
+        np = self._np
+        vectors = self._vectors[:self._n]
+        n_lists = int(math.sqrt(self._n))
+        sample = vectors[self._rng.choice(self._n, min(self._n, KMEANS_SAMPLE), replace=False)]
+        centroids = sample[self._rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = np.bincount(assign, minlength=n_lists) == 0
+            sums[empty] = centroids[empty]  # a cluster that lost all its members keeps its centre
+            centroids = self._normalize(sums)
+        self._centroids = centroids
+        assign = np.concatenate([np.argmax(vectors[i:i + 10000] @ centroids.T, axis=1)
+                                 for i in range(0, self._n, 10000)])
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(n_lists + 1))
+        self._lists = [order[bounds[c]:bounds[c + 1]].tolist() for c in range(n_lists)]
+
+    # --- querying ---
+    def embed(self, text_tokens):
+        """Unit vector for a token list in the LSA space (zeros if no word is known)."""
+        np = self._np
+        counts = {}
+        for tok in text_tokens:
+            tid = self.vocab.get(tok)
+            if tid is not None:
+                counts[tid] = counts.get(tid, 0) + 1
+        vec = np.zeros(self.dims, dtype=np.float32)
+        if counts:
+            cols = list(counts)
+            weights = np.asarray(self._weights(cols, [counts[c] for c in cols]), dtype=np.float32)
+            vec = weights @ self._basis[cols]
+            norm = np.linalg.norm(vec)
+            if norm > 0:
+                vec /= norm
+        return vec
+
+    def add(self, item):
+        """Fold a new pair into the index; returns its index."""
+        np = self._np
+        vec = self.embed(pair_tokens(item))
+        if self._n == len(self._vectors):
+            grown = np.zeros((max(16, 2 * self._n), self.dims), dtype=np.float32)
+            grown[:self._n] = self._vectors[:self._n]
+            self._vectors = grown
+        idx = self._n
+        self._vectors[idx] = vec
+        self._n += 1
+        if self._lists is not None:
+            self._lists[int(np.argmax(self._centroids @ vec))].append(idx)
+        return idx
+
+    def search(self, query, limit=5, exact=False):
+        """[(cosine, idx), ...] best first; exact=True compares against every pair."""
+        np = self._np
+        q = self.embed(tokenize(query))
+        if not self._n or not q.any():
+            return []
+        if exact or self._lists is None:
+            ids = None
+            sims = self._vectors[:self._n] @ q
+        else:
+            probe = np.argpartition(-(self._centroids @ q), min(N_PROBE, len(self._lists)) - 1)[:N_PROBE]
+            ids = np.fromiter((i for c in probe for i in self._lists[c]), dtype=np.int64)
+            if not len(ids):
+                return []
+            sims = self._vectors[ids] @ q
+        top = np.argsort(-sims)[:limit] if len(sims) <= limit else np.argpartition(-sims, limit)[:limit]
+        top = top[np.argsort(-sims[top])]
+        found = top if ids is None else ids[top]
+        return [(float(sims[t]), int(i)) for t, i in zip(top, found) if sims[t] > 0]
@@ -0,0 +1,142 @@
+"""
+qa_spell.py
+
+Usage:
+    from qa_spell import SpellIndex
+    spell = SpellIndex(["python", "tkinter"])
+    spell.correct("pyhton", df=lambda w: 1)     # -> "python"
+
+Typo correction for Q&A queries (no tkinter). Uses the SymSpell approach:
+every vocabulary word is stored under each string obtained by deleting up to
+max_distance of its characters, so the candidates for a misspelt word are found
+by generating the misspelling's own deletes and looking them up, instead of
+computing an edit distance against the whole vocabulary. Deletes are only
+generated from the first PREFIX_LENGTH characters of a word, which keeps the
+index small without missing corrections.
+
+The delete generation and candidate choice are plain functions so that the
+SQLite backend (qa_store.SqliteQAStore) can keep the same index in a table.
+"""
+
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+# words shorter than this are never corrected ("pip", "gui", ...)
+MIN_WORD_LENGTH = 4
+
+
+def correctable(word):
+    return len(word) >= MIN_WORD_LENGTH and word.isalpha()
+
+
+def max_distance_for(word):
+    # one edit in a four-letter word already changes a quarter of it
+    return 1 if len(word) <= 5 else MAX_DISTANCE
+
+
+def deletes(word, max_distance=MAX_DISTANCE):
+    """The word's prefix with 0..max_distance characters removed."""
+    key = word[:PREFIX_LENGTH]
+    out = {key}
+    level = {key}
+    for _ in range(max_distance):
+        level = {w[:i] + w[i + 1:] for w in level if len(w) > 1 for i in range(len(w))}
+        out |= level
+    return out
+
+
+def edit_distance(a, b, limit):
+    """Damerau-Levenshtein (optimal string alignment) distance, or limit + 1 if it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def best_candidate(word, candidates, df):
+    """Closest candidate to word, ties going to the more common one; None if none is close enough."""
+    limit = max_distance_for(word)
+    best, best_key = None, None
+    for cand in candidates:
+        dist = edit_distance(word, cand, limit)
+        if dist > limit:
+            continue
+        key = (dist, -df(cand), cand)
+        if best_key is None or key < best_key:
+            best, best_key = cand, key
+    return best
+
+
+class SpellIndex:
+    def __init__(self, words=()):
+        self._deletes = {}      # delete string -> word, or list of words when shared
+        self._words = set()
+        for word in words:
+            self.add(word)
+
+    def __contains__(self, word):
+        return word in self._words
+
+    def add(self, word):
+        if word in self._words or not correctable(word):
+            return
+        self._words.add(word)
+        table = self._deletes
+        for key in deletes(word):
+            have = table.get(key)
+            if have is None:
+                table[key] = word
+            elif isinstance(have, list):
+                have.append(word)
+            else:
+                table[key] = [have, word]
+
+    def candidates(self, word):
+        found = set()
+        for key in deletes(word, max_distance_for(word)):
+            have = self._deletes.get(key)
+            if have is None:
+                continue
+            if isinstance(have, list):
+                found.update(have)
+            else:
+                found.add(have)
+        return found
+
+    def correct(self, word, df):
+        """Best known replacement for an unknown word, or None."""
+        if word in self._words or not correctable(word):
+            return None
+        return best_candidate(word, self.candidates(word), df)
+
+
+def rewrite_query(query, tokens, fix, partial=False):
+    """
+    Apply fix(token) -> replacement or None to each of the query's tokens.
+    With partial=True an unfinished last word (no trailing space yet) is left
+    alone. Returns (query, [(wrong, right), ...]); the query comes back
+    unchanged when nothing was corrected.
+    """
+    unfinished = len(tokens) - 1 if partial and query[-1:].isalnum() else -1
+    fixes, out = [], []
+    for i, tok in enumerate(tokens):
+        right = fix(tok) if i != unfinished else None
+        if right:
+            fixes.append((tok, right))
+        out.append(right or tok)
+    if not fixes:
+        return query, []
+    text = " ".join(out)
+    if partial and unfinished < 0:
+        text += " "
+    return text, fixes
@@ -0,0 +1,476 @@
+"""
+qa_store.py
+
+Usage:
+    from qa_store import JournalQAStore, SqliteQAStore
+    store = JournalQAStore(QA_FILE, cache_file=QA_BANK_CACHE_FILE)
+    qa_list = store.load(default_items)
+    idx = store.add(item)           # appends to qa_list and journals it
+
+    bank = SqliteQAStore(QA_DB_FILE, QA_FILE)
+    bank.load(default_items)        # migrates QA_FILE on first open
+    matches = bank.search("how do i install pip", limit=5)
+
+Storage for the Q&A bank (no tkinter). The bank is a JSON snapshot
+(qa_questions.json) plus an append-only journal (qa_questions.journal) with
+one JSON record per add or edit, so saving a pair costs one short write
+instead of rewriting the whole bank. Once the journal grows past
+compact_after records it is folded into a fresh snapshot on a background
+thread. Every record carries a sequence number and the snapshot stores the
+last one it contains, so loading (snapshot, then journal replay) is correct
+even if the app dies in the middle of a write or a compaction. Given a
+cache_file, the snapshot's normalized pairs are read from a compiled copy (see
+bank_cache.py) instead of parsing the JSON again, until the snapshot changes.
+
+SqliteQAStore keeps the bank in an SQLite database instead, with an FTS5
+full-text index over question, tags and answer, for banks too large to hold in
+memory. Opening it only reads the row count, search runs BM25 inside SQLite and
+returns one page of results, and pairs are fetched by id when shown. It offers
+the same search interface as qa_index.QAIndex, so qa.py can use either.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from bank_cache import open_bank
+from qa_index import QAIndex, PrefixResult, tokenize
+from qa_spell import best_candidate, correctable, deletes, max_distance_for, rewrite_query
+
+SNAPSHOT_VERSION = 1
+COMPACT_AFTER = 500
+
+
+def normalize_item(item):
+    """Return a clean {"question", "answer", "tags"} dict, or None if item is unusable."""
+    if not isinstance(item, dict):
+        return None
+    q = str(item.get("question", "")).strip()
+    a = str(item.get("answer", "")).strip()
+    tags = item.get("tags", [])
+    if not isinstance(tags, list):
+        tags = []
+    tags = [str(t).strip().lower() for t in tags if str(t).strip()]
+    if q and a:
+        return {"question": q, "answer": a, "tags": tags}
+    return None
+
+
+def _write_atomic(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+class JournalQAStore:
+    def __init__(self, snapshot_file, compact_after=COMPACT_AFTER, cache_file=None):
+        self.snapshot_file = Path(snapshot_file)
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.journal_file = self.snapshot_file.with_suffix(".journal")
+        # journal being folded into a new snapshot (only exists during compaction)
+        self.compacting_file = self.snapshot_file.with_suffix(".journal.compacting")
+        self.compact_after = compact_after
+        self.items = []
+        self._seq = 0
+        self._journal_records = 0
+        self._lock = threading.Lock()
+        self._compactor = None
+        # (size, mtime) of the snapshot file as loaded, and how many leading
+        # pairs are exactly as that file has them (journal edits lower it);
+        # caches derived from the snapshot are keyed by these
+        self.snapshot_signature = None
+        self.snapshot_count = 0
+
+    # --- loading ---
+    def load(self, default_items=()):
+        """Read snapshot + journal and return the list of pairs (also kept as self.items)."""
+        if not self.snapshot_file.exists():
+            self._write_snapshot(list(default_items), 0)
+        if self.cache_file is not None:
+            meta, items = open_bank(self.snapshot_file, self._read_snapshot, self.cache_file)
+        else:
+            meta, items = self._read_snapshot(self.snapshot_file)
+        snapshot_seq = meta["seq"]
+        self.items = list(items)
+        self._seq = snapshot_seq
+        self.snapshot_count = len(self.items)
+
+        self._journal_records = 0
+        for path in (self.compacting_file, self.journal_file):
+            self._replay(path, snapshot_seq)
+
+        if self.compacting_file.exists():
+            # a compaction was interrupted; finish it now before appending again
+            self._compact()
+            self.snapshot_count = len(self.items)
+        stat = self.snapshot_file.stat()
+        self.snapshot_signature = (stat.st_size, stat.st_mtime_ns)
+        return self.items
+
+    @staticmethod
+    def _read_snapshot(path):
+        with path.open("r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        if isinstance(data, dict):
+            snapshot_seq = int(data.get("seq", 0))
+            raw_items = data.get("items", [])
+        else:
+            # plain list: the original qa_questions.json format
+            snapshot_seq = 0
+            raw_items = data
+        items = [it for it in (normalize_item(x) for x in raw_items) if it is not None]
+        return {"seq": snapshot_seq}, items
+
+    def _replay(self, path, snapshot_seq):
+        if not path.exists():
+            return
+        with path.open("rb") as fh:
+            raw = fh.read()
+        if raw and not raw.endswith(b"\n"):
+            # torn final record from a crash mid-write: drop it so new appends start clean
+            raw = raw[:raw.rfind(b"\n") + 1]
+            with path.open("r+b") as fh:
+                fh.truncate(len(raw))
+        for line in raw.decode("utf-8").splitlines():
+            try:
+                rec = json.loads(line)
+                seq = int(rec["seq"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            self._journal_records += 1
+            if seq <= snapshot_seq:
+                continue  # already part of the snapshot
+            self._apply(rec)
+            self._seq = max(self._seq, seq)
+
+    def _apply(self, rec):
+        item = normalize_item(rec.get("item"))
+        if item is None:
+            return
+        if rec.get("op") == "add":
+            self.items.append(item)
+        elif rec.get("op") == "edit":
+            idx = rec.get("index")
+            if isinstance(idx, int) and 0 <= idx < len(self.items):
+                self.items[idx] = item
+                self.snapshot_count = min(self.snapshot_count, idx)
+
+    # --- writing ---
+    def add(self, item):
+        """Append item to self.items and journal it; returns its index."""
+        with self._lock:
+            self.items.append(item)
+            idx = len(self.items) - 1
+            self._append({"op": "add", "item": item})
+        self._maybe_compact()
+        return idx
+
+    def edit(self, idx, item):
+        """Replace self.items[idx] and journal the edit."""
+        with self._lock:
+            self.items[idx] = item
+            self._append({"op": "edit", "index": idx, "item": item})
+        self._maybe_compact()
+
+    def _append(self, rec):
+        # caller holds self._lock, so the list and the journal never disagree
+        # when a compaction takes its copy
+        self._seq += 1
+        rec["seq"] = self._seq
+        with self.journal_file.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._journal_records += 1
+
+    def _maybe_compact(self):
+        if self._journal_records >= self.compact_after:
+            self.compact_in_background()
+
+    # --- compaction ---
+    def compact_in_background(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact, name="qa-compact", daemon=True)
+        self._compactor.start()
+
+    def _compact(self):
+        with self._lock:
+            # new appends go to a fresh journal while the snapshot is written
+            if self.journal_file.exists():
+                if self.compacting_file.exists():
+                    with self.journal_file.open("rb") as src, self.compacting_file.open("ab") as dst:
+                        dst.write(src.read())
+                    self.journal_file.unlink()
+                else:
+                    os.replace(self.journal_file, self.compacting_file)
+            items = list(self.items)
+            seq = self._seq
+            self._journal_records = 0
+        self._write_snapshot(items, seq)
+        if self.compacting_file.exists():
+            self.compacting_file.unlink()
+
+    def _write_snapshot(self, items, seq):
+        _write_atomic(self.snapshot_file,
+                      json.dumps({"version": SNAPSHOT_VERSION, "seq": seq, "items": items},
+                                 indent=2, ensure_ascii=False))
+
+    def close(self):
+        """Wait for a running compaction to finish."""
+        if self._compactor is not None:
+            self._compactor.join()
+
+
+class SqliteQAStore:
+    # bm25() column weights for question, tags and answer; tags count double as in
+    # QAIndex, answers only a little so answer-only hits rank below question hits
+    BM25_WEIGHTS = (1.0, QAIndex.TAG_WEIGHT, 0.2)
+    MIN_PREFIX = QAIndex.MIN_PREFIX
+    MAX_COMPLETIONS = QAIndex.MAX_COMPLETIONS
+    MAX_LIVE_CANDIDATES = QAIndex.MAX_LIVE_CANDIDATES
+    # upper bound on the postings one search() ranks, whatever the bank size
+    SEARCH_MAX_POSTINGS = 50000
+
+    _SCHEMA = (
+        """CREATE TABLE qa (
+            id INTEGER PRIMARY KEY,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            tags TEXT NOT NULL              -- JSON list
+        )""",
+        """CREATE VIRTUAL TABLE qa_fts USING fts5(
+            question, tags, answer,
+            content='qa', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 0'
+        )""",
+        "CREATE VIRTUAL TABLE qa_vocab USING fts5vocab(qa_fts, 'row')",
+    )
+    # SymSpell deletes (see qa_spell.py) of every indexed word, for typo correction
+    _SPELL_SCHEMA = """CREATE TABLE qa_spell (
+            del TEXT NOT NULL,
+            term TEXT NOT NULL,
+            PRIMARY KEY (del, term)
+        ) WITHOUT ROWID"""
+    # created after the bulk load so migrated rows are indexed in one pass
+    _TRIGGERS = (
+        """CREATE TRIGGER qa_ai AFTER INSERT ON qa BEGIN
+            INSERT INTO qa_fts(rowid, question, tags, answer)
+            VALUES (new.id, new.question, new.tags, new.answer);
+        END""",
+        """CREATE TRIGGER qa_au AFTER UPDATE ON qa BEGIN
+            INSERT INTO qa_fts(qa_fts, rowid, question, tags, answer)
+            VALUES ('delete', old.id, old.question, old.tags, old.answer);
+            INSERT INTO qa_fts(rowid, question, tags, answer)
+            VALUES (new.id, new.question, new.tags, new.answer);
+        END""",
+    )
+
+    def __init__(self, db_file, json_file=None):
+        self.db_file = Path(db_file)
+        # JSON bank (snapshot + journal) to migrate from on first open
+        self.json_file = Path(json_file) if json_file is not None else None
+        self._conn = None
+        self._count = 0
+
+    # --- loading ---
+    def load(self, default_items=()):
+        """Open the database, creating and filling it on first use. Returns self."""
+        # autocommit; every write below is a single statement or an explicit transaction
+        self._conn = sqlite3.connect(self.db_file, isolation_level=None)
+        has_schema = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'qa'").fetchone()
+        if not has_schema:
+            self._create(default_items)
+        has_spell = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'qa_spell'").fetchone()
+        if not has_spell:
+            # databases made before typo correction existed get the table once
+            self._conn.execute("BEGIN")
+            self._conn.execute(self._SPELL_SCHEMA)
+            self._add_spell_terms(term for (term,) in self._conn.execute("SELECT term FROM qa_vocab"))
+            self._conn.execute("COMMIT")
+        # ids are 0..n-1 in insertion order, so this is an index lookup, not a scan
+        (last,) = self._conn.execute("SELECT max(id) FROM qa").fetchone()
+        self._count = 0 if last is None else last + 1
+        return self
+
+    def _create(self, default_items):
+        if self.json_file is not None and (self.json_file.exists()
+                                           or self.json_file.with_suffix(".journal").exists()):
+            items = JournalQAStore(self.json_file).load(default_items)
+        else:
+            items = [it for it in (normalize_item(x) for x in default_items) if it is not None]
+        # one transaction, so an interrupted migration leaves no half-built schema behind
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+            conn.executemany(
+                "INSERT INTO qa (id, question, answer, tags) VALUES (?, ?, ?, ?)",
+                ((i, it["question"], it["answer"], json.dumps(it["tags"], ensure_ascii=False))
+                 for i, it in enumerate(items)))
+            # one bulk index build is much faster than indexing row by row
+            conn.execute("INSERT INTO qa_fts(qa_fts) VALUES ('rebuild')")
+            for statement in self._TRIGGERS:
+                conn.execute(statement)
+            conn.execute(self._SPELL_SCHEMA)
+            self._add_spell_terms(term for (term,) in conn.execute("SELECT term FROM qa_vocab"))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # --- pairs ---
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def _row_to_item(row):
+        return {"question": row[0], "answer": row[1], "tags": json.loads(row[2])}
+
+    def get(self, idx):
+        row = self._conn.execute("SELECT question, answer, tags FROM qa WHERE id = ?", (idx,)).fetchone()
+        if row is None:
+            raise IndexError(idx)
+        return self._row_to_item(row)
+
+    def page(self, offset, limit):
+        """[(idx, pair), ...] for up to limit pairs starting at offset, in bank order."""
+        rows = self._conn.execute(
+            "SELECT id, question, answer, tags FROM qa WHERE id >= ? ORDER BY id LIMIT ?", (offset, limit))
+        return [(row[0], self._row_to_item(row[1:])) for row in rows]
+
+    def iter_pairs(self):
+        """Every pair in bank order, read over a connection of its own so it can run on another thread."""
+        conn = sqlite3.connect(self.db_file)
+        try:
+            for row in conn.execute("SELECT question, answer, tags FROM qa WHERE id < ? ORDER BY id",
+                                    (self._count,)):
+                yield self._row_to_item(row)
+        finally:
+            conn.close()
+
+    def add(self, item):
+        """Insert item (indexed by trigger) and return its index."""
+        idx = self._count
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            conn.execute("INSERT INTO qa (id, question, answer, tags) VALUES (?, ?, ?, ?)",
+                         (idx, item["question"], item["answer"],
+                          json.dumps(item.get("tags", []), ensure_ascii=False)))
+            words = set(tokenize(" ".join([item["question"], item["answer"]] + item.get("tags", []))))
+            # words seen for the first time also become typo-correction targets
+            self._add_spell_terms(word for word in words if self.df(word) == 1)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._count += 1
+        return idx
+
+    def _add_spell_terms(self, terms):
+        self._conn.executemany("INSERT OR IGNORE INTO qa_spell (del, term) VALUES (?, ?)",
+                               ((key, term) for term in terms if correctable(term) for key in deletes(term)))
+
+    def edit(self, idx, item):
+        self._conn.execute("UPDATE qa SET question = ?, answer = ?, tags = ? WHERE id = ?",
+                           (item["question"], item["answer"],
+                            json.dumps(item.get("tags", []), ensure_ascii=False), idx))
+
+    def sync(self):
+        # adds go straight into the database, so there is never anything to catch up on
+        return []
+
+    # --- search ---
+    def df(self, token):
+        row = self._conn.execute("SELECT doc FROM qa_vocab WHERE term = ?", (token,)).fetchone()
+        return row[0] if row else 0
+
+    def correct_query(self, query, partial=False):
+        """Same as QAIndex.correct_query, with the deletes looked up in qa_spell."""
+        def fix(tok):
+            if not correctable(tok) or self.df(tok):
+                return None
+            keys = list(deletes(tok, max_distance_for(tok)))
+            rows = self._conn.execute(
+                f"SELECT DISTINCT term FROM qa_spell WHERE del IN ({', '.join('?' * len(keys))})", keys)
+            return best_candidate(tok, [term for (term,) in rows], self.df)
+        return rewrite_query(query, tokenize(query), fix, partial)
+
+    def _ranked(self, match, limit, offset=0):
+        # bm25() is lower-is-better; negate it so scores read like QAIndex's
+        sql = ("SELECT rowid, -bm25(qa_fts, ?, ?, ?) AS score FROM qa_fts WHERE qa_fts MATCH ? "
+               "ORDER BY score DESC LIMIT ? OFFSET ?")
+        rows = self._conn.execute(sql, (*self.BM25_WEIGHTS, match, -1 if limit is None else limit, offset))
+        return [(score, idx) for idx, score in rows]
+
+    def search(self, query, limit=None, offset=0, substring=None):
+        """
+        Return [(score, idx), ...] for pairs matching any query word, best
+        first. substring is accepted for QAIndex compatibility and unused:
+        answers are part of the full-text index.
+        """
+        dfs = {tok: self.df(tok) for tok in tokenize(query)}
+        if not dfs:
+            return []
+        # SQLite has to score every pair matching any term, so add terms rarest
+        # first and stop before very common words ("how", "what") blow the budget
+        terms, postings = [], 0
+        for tok in sorted(dfs, key=dfs.get):
+            if terms and postings + dfs[tok] > self.SEARCH_MAX_POSTINGS:
+                break
+            terms.append(f'"{tok}"')
+            postings += dfs[tok]
+        return self._ranked(" OR ".join(terms), limit, offset)
+
+    def prefix_search(self, text, previous=None, limit=5):
+        """
+        Search-as-you-type with the same rules and result type as
+        QAIndex.prefix_search. SQLite narrows the matches itself, so previous is
+        accepted for compatibility but not needed.
+        """
+        toks = tokenize(text)
+        if toks and text[-1:].isalnum():
+            complete, prefix = toks[:-1], toks[-1]
+        else:
+            complete, prefix = toks, ""
+        completions, filter_prefix = [], ""
+        if len(prefix) >= self.MIN_PREFIX:
+            rows = self._conn.execute("SELECT term FROM qa_vocab WHERE term >= ? AND term < ? LIMIT ?",
+                                      (prefix, prefix + "\uffff", self.MAX_COMPLETIONS + 1))
+            completions = [term for (term,) in rows]
+            if len(completions) <= self.MAX_COMPLETIONS:
+                # few enough words to match on, and to order by how common they are
+                filter_prefix = prefix
+                completions.sort(key=self.df, reverse=True)
+            else:
+                completions = completions[:self.MAX_COMPLETIONS]
+
+        # words as common as "how" or "what" rank results but do not filter them
+        required = [tok for tok in dict.fromkeys(complete) if self.df(tok) <= self.MAX_LIVE_CANDIDATES]
+        terms = [f'"{tok}"' for tok in required]
+        if filter_prefix:
+            terms.append(f'"{filter_prefix}" *')
+        if not terms:
+            return PrefixResult(text, complete, prefix, None, [], completions, truncated=bool(toks))
+
+        match = " AND ".join(terms)
+        candidates = [idx for (idx,) in self._conn.execute(
+            "SELECT rowid FROM qa_fts WHERE qa_fts MATCH ? LIMIT ?", (match, self.MAX_LIVE_CANDIDATES + 1))]
+        if len(candidates) > self.MAX_LIVE_CANDIDATES:
+            return PrefixResult(text, complete, prefix, None, [], completions, truncated=True)
+        return PrefixResult(text, complete, prefix, candidates, self._ranked(match, limit),
+                            completions, False, filter_prefix)
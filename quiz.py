@@ -4,16 +4,43 @@ quiz.py
 Usage:
     from quiz import launch_quiz
     # in your main.py, call launch_quiz(main_area)
+
+Questions come from quiz_questions.json, or, when it exists, from
+quiz_questions.jsonl (one question object per line). A JSONL bank can be
+arbitrarily large: it is never loaded whole, and each quiz draws a fresh random
+set of questions from it. Both are read through a compiled cache that is
+memory-mapped and only rebuilt when the file changes (see bank_cache.py); while
+a JSONL bank's cache is being rebuilt, in the background, quizzes are sampled
+from the file directly.
+
+"Review Due Cards" runs a spaced-repetition session instead: the questions
+whose review is due (SM-2 scheduling, see quiz_srs.py), then a few new ones.
+Every answer is appended to quiz_reviews.jsonl, which carries the schedule
+from one session to the next.
+
+The quiz state itself (questions, order, answers, score, history) is kept by
+quiz_engine.QuizEngine; this module only draws it and feeds it answers.
+
+Answers from ordinary quizzes are logged there as well. With "Focus on weak
+questions" ticked, a quiz is drawn with weights from that history, so
+questions often missed or answered slowly come up more (see quiz_adaptive.py).
 """
 
 import json
-import random
+import time
 from pathlib import Path
 import tkinter as tk
 from tkinter import messagebox
 
+from quiz_bank import open_questions, quick_sample
+from quiz_engine import QuizEngine
+
 BASE_DIR = Path(__file__).parent
 QUESTIONS_FILE = BASE_DIR / "quiz_questions.json"
+QUESTIONS_JSONL_FILE = BASE_DIR / "quiz_questions.jsonl"
+
+# questions per quiz when drawing from a JSONL bank
+QUIZ_SAMPLE_SIZE = 20
 
 # Sample questions (used to bootstrap quiz_questions.json if missing)
 _SAMPLE_QUESTIONS = [
@@ -43,28 +70,17 @@ _SAMPLE_QUESTIONS = [
 def load_questions():
     """
     Load questions from quiz_questions.json. If not present, create it with sample questions.
-    Returns a list of question dicts having keys: question, options, answer (index).
+    Returns a read-only sequence of question dicts (a bank_cache.CompiledBank, or a
+    list if the cache cannot be written) having keys: question, options, answer (index).
     """
     try:
         if not QUESTIONS_FILE.exists():
             with QUESTIONS_FILE.open("w", encoding="utf-8") as f:
                 json.dump(_SAMPLE_QUESTIONS, f, indent=2, ensure_ascii=False)
-        with QUESTIONS_FILE.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-            questions = []
-            for q in data:
-                if not isinstance(q, dict):
-                    continue
-                if "question" not in q or "options" not in q or "answer" not in q:
-                    continue
-                questions.append({
-                    "question": str(q["question"]),
-                    "options": [str(opt) for opt in q["options"]],
-                    "answer": int(q["answer"])
-                })
-            if not questions:
-                raise ValueError("No valid questions found in quiz_questions.json")
-            return questions
+        questions = open_questions(QUESTIONS_FILE)
+        if not len(questions):
+            raise ValueError("No valid questions found in quiz_questions.json")
+        return questions
     except Exception as e:
         messagebox.showerror("Quiz Load Error", f"Could not load quiz questions:\n{e}")
         return []
@@ -80,100 +96,163 @@ def launch_quiz(parent_frame):
     Render the quiz UI inside parent_frame. This function clears parent_frame contents.
     Call it from main.py as: launch_quiz(main_area)
     """
-    questions = load_questions()
-    if not questions:
+    # a JSONL bank is sampled afresh for every quiz instead of being loaded here
+    streaming = QUESTIONS_JSONL_FILE.exists()
+    questions = [] if streaming else load_questions()
+    if not streaming and not questions:
         return
-
-    # UI state
+    bank_file = QUESTIONS_JSONL_FILE if streaming else QUESTIONS_FILE
+    if streaming:
+        # until its compiled cache is built (in the background), a quiz is
+        # sampled straight from the file instead of waiting for the compile
+        engine = QuizEngine(lambda: open_questions(QUESTIONS_JSONL_FILE), sample_size=QUIZ_SAMPLE_SIZE,
+                            quick_sample=lambda size, rng: quick_sample(QUESTIONS_JSONL_FILE, size, rng))
+    else:
+        engine = QuizEngine(lambda: questions)
+
+    # UI state; the quiz itself (questions, order, answers, score) lives in engine
     state = {
-        "questions": questions.copy(),
-        "order": list(range(len(questions))),
-        "index": 0,
-        "score": 0,
-        "selected": None,  # IntVar for selected option (created per-question with explicit master)
-        "user_answers": {},  # idx -> selected_index
+        "selected": None,  # IntVar for selected option (created with the question screen, explicit master)
         # create BooleanVar with explicit master to avoid "no default root" errors
-        "shuffle": tk.BooleanVar(master=parent_frame, value=False)
+        "shuffle": tk.BooleanVar(master=parent_frame, value=False),
+        "adaptive": tk.BooleanVar(master=parent_frame, value=False),
+        "quiz_size": tk.IntVar(master=parent_frame, value=QUIZ_SAMPLE_SIZE),
+        # per-question render times (ms) for the current quiz; the first one
+        # also creates the question screen's widgets
+        "render_ms": [],
+        "shown_at": 0.0,  # when the current question appeared (time.monotonic)
+        "restart": None  # start_quiz or start_review, for the results screen
     }
 
-    def start_quiz():
-        state["order"] = list(range(len(state["questions"])))
-        if state["shuffle"].get():
-            random.shuffle(state["order"])
-        state["index"] = 0
-        state["score"] = 0
-        state["user_answers"].clear()
+    def session_size():
+        try:
+            return max(1, state["quiz_size"].get())
+        except tk.TclError:  # not a number in the spinbox
+            return QUIZ_SAMPLE_SIZE
+
+    def begin(restart):
+        state["restart"] = restart
+        state["render_ms"] = []
         show_question()
 
-    def show_question():
+    def start_quiz():
+        try:
+            # a JSON bank is quizzed whole (adaptive: weak questions tending to come first)
+            engine.start_quiz(size=session_size() if streaming else None,
+                              shuffle=state["shuffle"].get(), adaptive=state["adaptive"].get())
+        except Exception as e:
+            messagebox.showerror("Quiz Load Error", f"Could not load quiz questions:\n{e}")
+            return
+        begin(start_quiz)
+
+    def start_review():
+        try:
+            started = engine.start_review(session_size())
+        except Exception as e:
+            messagebox.showerror("Quiz Load Error", f"Could not load the answer history:\n{e}")
+            return
+        if not started:
+            next_due = engine.history.next_due_time()
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(next_due)) if next_due else "never"
+            messagebox.showinfo("Nothing Due", f"No cards are due for review.\nNext card due: {when}")
+            return
+        begin(start_review)
+
+    # the question screen is built once per quiz and updated in place for each
+    # question; other screens clear parent_frame, which destroys it
+    view = {}
+
+    def build_question_view():
         _clear_frame(parent_frame)
-        qidx = state["order"][state["index"]]
-        qobj = state["questions"][qidx]
-
-        title = tk.Label(parent_frame, text="Quiz", font=("Comic Sans MS", 22, "bold"),
-                         bg=parent_frame.cget("bg"), fg="#F28C28")
-        title.place(relx=0.5, y=20, anchor="center")
+        bg = parent_frame.cget("bg")
+        view["title"] = tk.Label(parent_frame, text="Quiz", font=("Comic Sans MS", 22, "bold"),
+                                 bg=bg, fg="#F28C28")
+        view["title"].place(relx=0.5, y=20, anchor="center")
 
-        progress = tk.Label(parent_frame, text=f"Question {state['index']+1} of {len(state['questions'])}",
-                            font=("Segoe UI", 11), bg=parent_frame.cget("bg"), fg="#FFF6E0")
-        progress.place(relx=0.5, y=60, anchor="center")
+        view["progress"] = tk.Label(parent_frame, font=("Segoe UI", 11), bg=bg, fg="#FFF6E0")
+        view["progress"].place(relx=0.5, y=60, anchor="center")
 
-        q_label = tk.Label(parent_frame, text=qobj["question"], font=("Segoe UI", 14),
-                           bg=parent_frame.cget("bg"), fg="#FFF6E0", wraplength=680, justify="left")
-        q_label.place(x=40, y=100)
+        view["question"] = tk.Label(parent_frame, font=("Segoe UI", 14),
+                                    bg=bg, fg="#FFF6E0", wraplength=680, justify="left")
+        view["question"].place(x=40, y=100)
 
         # create IntVar with explicit master (parent_frame) so it doesn't try to use a default root
         state["selected"] = tk.IntVar(master=parent_frame, value=-1)
-        options_frame = tk.Frame(parent_frame, bg=parent_frame.cget("bg"))
-        options_frame.place(x=40, y=160)
+        view["options_frame"] = tk.Frame(parent_frame, bg=bg)
+        view["options_frame"].place(x=40, y=160)
+        view["options"] = []
+
+        btn_frame = tk.Frame(parent_frame, bg=bg)
+        btn_frame.place(relx=0.5, y=420, anchor="center")
+
+        view["next"] = tk.Button(btn_frame, command=on_next, bg="#F28C28", fg="white",
+                                 font=("Segoe UI", 12, "bold"), width=12)
+        view["next"].pack(side="left", padx=8)
 
-        for opt_i, opt_text in enumerate(qobj["options"]):
+        quit_btn = tk.Button(btn_frame, text="Quit", command=lambda: show_start(), bg="#6c757d", fg="white",
+                             font=("Segoe UI", 12), width=10)
+        quit_btn.pack(side="left", padx=8)
+
+    def set_option_count(n):
+        # only create or destroy Radiobuttons when the number of options changes
+        options = view["options"]
+        bg = parent_frame.cget("bg")
+        while len(options) < n:
             rb = tk.Radiobutton(
-                options_frame,
-                text=opt_text,
+                view["options_frame"],
                 variable=state["selected"],
-                value=opt_i,
+                value=len(options),
                 font=("Segoe UI", 12),
-                bg=parent_frame.cget("bg"),
+                bg=bg,
                 fg="#FFD580",
-                selectcolor=parent_frame.cget("bg"),
-                activebackground=parent_frame.cget("bg"),
+                selectcolor=bg,
+                activebackground=bg,
                 anchor="w",
                 justify="left"
             )
             rb.pack(anchor="w", pady=6)
+            options.append(rb)
+        while len(options) > n:
+            options.pop().destroy()
 
-        btn_frame = tk.Frame(parent_frame, bg=parent_frame.cget("bg"))
-        btn_frame.place(relx=0.5, y=420, anchor="center")
-
-        def on_next():
-            sel = state["selected"].get()
-            if sel == -1:
-                messagebox.showwarning("No answer", "Please select an answer before continuing.")
-                return
-            q_real_idx = state["order"][state["index"]]
-            state["user_answers"][q_real_idx] = sel
-            if sel == state["questions"][q_real_idx]["answer"]:
-                state["score"] += 1
-            state["index"] += 1
-            if state["index"] >= len(state["questions"]):
-                show_results()
-            else:
-                show_question()
-
-        next_text = "Finish" if state["index"] == len(state["questions"]) - 1 else "Next"
-        next_btn = tk.Button(btn_frame, text=next_text, command=on_next, bg="#F28C28", fg="white",
-                             font=("Segoe UI", 12, "bold"), width=12)
-        next_btn.pack(side="left", padx=8)
-
-        quit_btn = tk.Button(btn_frame, text="Quit", command=lambda: show_start(), bg="#6c757d", fg="white",
-                             font=("Segoe UI", 12), width=10)
-        quit_btn.pack(side="left", padx=8)
+    def show_question():
+        t0 = time.perf_counter()
+        if not view or not view["title"].winfo_exists():
+            view.clear()
+            build_question_view()
+        qobj = engine.current
+
+        view["progress"].config(text=f"Question {engine.index + 1} of {engine.total}")
+        view["question"].config(text=qobj["question"])
+        set_option_count(len(qobj["options"]))
+        for rb, opt_text in zip(view["options"], qobj["options"]):
+            rb.config(text=opt_text)
+        state["selected"].set(-1)
+        view["next"].config(text="Finish" if engine.is_last else "Next")
+
+        # Tk lays out and redraws in idle callbacks queued by the changes above;
+        # one queued after them times the whole re-render without forcing it
+        parent_frame.after_idle(lambda: state["render_ms"].append((time.perf_counter() - t0) * 1000))
+        state["shown_at"] = time.monotonic()
+
+    def on_next():
+        sel = state["selected"].get()
+        if sel == -1:
+            messagebox.showwarning("No answer", "Please select an answer before continuing.")
+            return
+        try:
+            engine.answer(sel, time.monotonic() - state["shown_at"])
+        except OSError as e:
+            messagebox.showerror("Save Error", f"Could not save the answer:\n{e}")
+        if engine.finished:
+            show_results()
+        else:
+            show_question()
 
     def show_results():
         _clear_frame(parent_frame)
-        total = len(state["questions"])
-        score = state["score"]
+        total = engine.total
+        score = engine.score
 
         title = tk.Label(parent_frame, text="Quiz Results", font=("Comic Sans MS", 22, "bold"),
                          bg=parent_frame.cget("bg"), fg="#F28C28")
@@ -187,7 +266,8 @@ def launch_quiz(parent_frame):
                                bg="#FFD580", fg="#333", font=("Segoe UI", 12, "bold"), width=16)
         review_btn.place(relx=0.5, y=120, anchor="center")
 
-        restart_btn = tk.Button(parent_frame, text="Restart Quiz", command=start_quiz,
+        restart_btn = tk.Button(parent_frame, text="Next Reviews" if engine.reviewing else "Restart Quiz",
+                                command=lambda: state["restart"](),
                                 bg="#F28C28", fg="white", font=("Segoe UI", 12, "bold"), width=16)
         restart_btn.place(relx=0.5, y=170, anchor="center")
 
@@ -195,6 +275,15 @@ def launch_quiz(parent_frame):
                              bg="#6c757d", fg="white", font=("Segoe UI", 12, "bold"), width=16)
         done_btn.place(relx=0.5, y=220, anchor="center")
 
+        times = state["render_ms"]
+        if times:
+            reused = times[1:] or times
+            timing = tk.Label(parent_frame,
+                              text=f"Question screen: built in {times[0]:.1f} ms, "
+                                   f"then {sum(reused) / len(reused):.1f} ms avg / {max(reused):.1f} ms max per question",
+                              font=("Segoe UI", 9), bg=parent_frame.cget("bg"), fg="#AAA")
+            timing.place(relx=0.5, y=265, anchor="center")
+
     def show_review():
         _clear_frame(parent_frame)
         title = tk.Label(parent_frame, text="Review", font=("Comic Sans MS", 20, "bold"),
@@ -207,13 +296,12 @@ def launch_quiz(parent_frame):
         inner = tk.Frame(canvas, bg=parent_frame.cget("bg"))
         canvas.create_window((0, 0), window=inner, anchor="nw")
 
-        for i, q in enumerate(state["questions"]):
+        for i, (q, ua) in enumerate(engine.review_items()):
             q_frame = tk.Frame(inner, bg=parent_frame.cget("bg"))
             q_frame.pack(fill="x", pady=8, padx=4, anchor="w")
             q_lbl = tk.Label(q_frame, text=f"{i+1}. {q['question']}", font=("Segoe UI", 12, "bold"),
                              bg=parent_frame.cget("bg"), fg="#FFF6E0", wraplength=700, justify="left")
             q_lbl.pack(anchor="w")
-            ua = state["user_answers"].get(i, None)
             for opt_idx, opt in enumerate(q["options"]):
                 txt = opt
                 if opt_idx == q["answer"]:
@@ -241,34 +329,58 @@ def launch_quiz(parent_frame):
                          bg=parent_frame.cget("bg"), fg="#F28C28")
         title.place(relx=0.5, y=40, anchor="center")
 
-        info = tk.Label(parent_frame, text=f"Questions: {len(state['questions'])}", font=("Segoe UI", 12),
+        if streaming:
+            info_text = f"Question bank: {bank_file.name} (random questions each time)"
+        else:
+            info_text = f"Questions: {len(questions)}"
+        info = tk.Label(parent_frame, text=info_text, font=("Segoe UI", 12),
                         bg=parent_frame.cget("bg"), fg="#FFF6E0")
         info.place(relx=0.5, y=90, anchor="center")
 
         shuffle_cb = tk.Checkbutton(parent_frame, text="Shuffle Questions", variable=state["shuffle"],
                                     font=("Segoe UI", 11), bg=parent_frame.cget("bg"), fg="#FFD580",
                                     selectcolor=parent_frame.cget("bg"), activebackground=parent_frame.cget("bg"))
-        shuffle_cb.place(relx=0.5, y=130, anchor="center")
+        shuffle_cb.place(relx=0.5, y=120, anchor="center")
+
+        adaptive_cb = tk.Checkbutton(parent_frame, text="Focus on weak questions", variable=state["adaptive"],
+                                     font=("Segoe UI", 11), bg=parent_frame.cget("bg"), fg="#FFD580",
+                                     selectcolor=parent_frame.cget("bg"), activebackground=parent_frame.cget("bg"))
+        adaptive_cb.place(relx=0.5, y=148, anchor="center")
 
         start_btn = tk.Button(parent_frame, text="Start Quiz", command=start_quiz,
                               bg="#F28C28", fg="white", font=("Segoe UI", 14, "bold"), width=16)
-        start_btn.place(relx=0.5, y=180, anchor="center")
+        start_btn.place(relx=0.5, y=190, anchor="center")
+
+        if streaming:
+            size_frame = tk.Frame(parent_frame, bg=parent_frame.cget("bg"))
+            size_frame.place(relx=0.5, y=173, anchor="center")
+            tk.Label(size_frame, text="Questions per quiz:", font=("Segoe UI", 11),
+                     bg=parent_frame.cget("bg"), fg="#FFD580").pack(side="left")
+            tk.Spinbox(size_frame, from_=1, to=500, textvariable=state["quiz_size"], width=5,
+                       font=("Segoe UI", 11)).pack(side="left", padx=(6, 0))
+            shuffle_cb.place(relx=0.5, y=120, anchor="center")
+            adaptive_cb.place(relx=0.5, y=145, anchor="center")
+            start_btn.place(relx=0.5, y=210, anchor="center")
+
+        review_btn = tk.Button(parent_frame, text="Review Due Cards", command=start_review,
+                               bg="#FFD580", fg="#333", font=("Segoe UI", 12, "bold"), width=16)
+        review_btn.place(relx=0.5, y=260 if streaming else 240, anchor="center")
 
         def open_questions_file():
             try:
                 import os, sys
-                messagebox.showinfo("Edit Questions", f"Edit {QUESTIONS_FILE.name} to add/remove questions.\nFile path:\n{QUESTIONS_FILE}")
+                messagebox.showinfo("Edit Questions", f"Edit {bank_file.name} to add/remove questions.\nFile path:\n{bank_file}")
                 if sys.platform.startswith("win"):
-                    os.startfile(QUESTIONS_FILE)
+                    os.startfile(bank_file)
                 elif sys.platform == "darwin":
-                    os.system(f"open {QUESTIONS_FILE!s}")
+                    os.system(f"open {bank_file!s}")
                 else:
-                    os.system(f"xdg-open {QUESTIONS_FILE!s}")
+                    os.system(f"xdg-open {bank_file!s}")
             except Exception as e:
                 messagebox.showerror("Open File Error", str(e))
 
         edit_btn = tk.Button(parent_frame, text="Edit Questions", command=open_questions_file,
                              bg="#FFD580", fg="#333", font=("Segoe UI", 11, "bold"))
-        edit_btn.place(relx=0.5, y=230, anchor="center")
+        edit_btn.place(relx=0.5, y=310 if streaming else 290, anchor="center")
 
     show_start()
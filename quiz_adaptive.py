@@ -0,0 +1,136 @@
+"""
+quiz_adaptive.py
+
+Usage:
+    from quiz_adaptive import AdaptiveSampler
+    sampler = AdaptiveSampler(srs.positions, srs.stats)  # card id -> bank index, card id -> [attempts, correct, seconds]
+    picked = sampler.sample(20)                          # bank indices, weak questions more likely
+    sampler.update(card_id, srs.stats[card_id])          # after each answer
+
+Adaptive question selection for the quiz (no tkinter). Every question gets a
+weight from its answer history: questions often answered wrongly or slowly
+weigh more, unseen ones sit in between, so a quiz keeps returning to weak
+areas without leaving out the rest of the bank.
+
+The weights live in a Fenwick (binary indexed) tree, so drawing a question is
+a walk down the tree's prefix sums and changing one question's weight after an
+answer touches O(log n) entries; neither ever rebuilds the table, which keeps
+banks of hundreds of thousands of questions cheap. A quiz is drawn without
+replacement by zeroing each drawn weight and restoring them all afterwards.
+
+The tree is indexed by bank position (a repeated question's later copies
+weigh nothing), so a draw is a list of bank indices and only the drawn
+questions need decoding from the bank.
+"""
+
+import random
+from array import array
+from itertools import chain
+
+MIN_WEIGHT = 0.05           # even a well-known question comes up now and then
+TARGET_SECONDS = 15.0       # answers slower than this raise a question's weight
+MAX_SLOWNESS = 2.0
+
+
+def question_weight(stat):
+    """Sampling weight from [attempts, correct, seconds] (None for an unseen question)."""
+    if not stat or not stat[0]:
+        attempts, correct, mean_seconds = 0, 0, TARGET_SECONDS
+    else:
+        attempts, correct = stat[0], stat[1]
+        mean_seconds = stat[2] / attempts
+    # Laplace-smoothed miss rate: an unseen question counts as 50% wrong
+    miss = (attempts - correct + 1) / (attempts + 2)
+    slowness = min(MAX_SLOWNESS, max(0.5, mean_seconds / TARGET_SECONDS))
+    return MIN_WEIGHT + miss * slowness
+
+
+class FenwickTree:
+    """Non-negative weights with O(log n) update, prefix sum and weighted lookup."""
+
+    def __init__(self, weights):
+        self.values = array("d", weights)
+        n = len(self.values)
+        tree = array("d", bytes(8 * (n + 1)))
+        for i in range(1, n + 1):   # O(n) build: push each node into its parent
+            tree[i] += self.values[i - 1]
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._top = 1 << (n.bit_length() - 1) if n else 0   # highest power of two <= n
+
+    def __len__(self):
+        return len(self.values)
+
+    def set(self, i, weight):
+        delta = weight - self.values[i]
+        self.values[i] = weight
+        tree, n = self._tree, len(self.values)
+        i += 1
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+
+    def total(self):
+        tree, i, s = self._tree, len(self.values), 0.0
+        while i > 0:
+            s += tree[i]
+            i -= i & -i
+        return s
+
+    def find(self, x):
+        """Index whose cumulative range contains x, for 0 <= x < total()."""
+        tree, n = self._tree, len(self.values)
+        pos, step = 0, self._top
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= x:
+                pos = nxt
+                x -= tree[nxt]
+            step >>= 1
+        return min(pos, n - 1)
+
+
+class AdaptiveSampler:
+    def __init__(self, positions, stats, rng=None):
+        self._pos = positions       # card id -> bank index; shared, not copied
+        weights = array("d", bytes(8 * (max(positions.values(), default=-1) + 1)))
+        for cid, i in positions.items():
+            weights[i] = question_weight(stats.get(cid))
+        self._tree = FenwickTree(weights)
+        self._rng = rng or random.Random()
+
+    def __len__(self):
+        return len(self._pos)
+
+    def sample(self, k):
+        """Up to k distinct bank indices, each draw proportional to the remaining weights."""
+        tree, values = self._tree, self._tree.values
+        drawn = []
+        for _ in range(min(k, len(self._pos))):
+            total = tree.total()
+            if total <= 0:
+                break
+            i = tree.find(self._rng.random() * total)
+            if values[i] <= 0:
+                # float drift put x at the edge of a zeroed slot: take the nearest live one
+                live = (j for j in chain(range(i, -1, -1), range(i + 1, len(values))) if values[j] > 0)
+                i = next(live, None)
+                if i is None:
+                    break
+            drawn.append((i, values[i]))
+            tree.set(i, 0.0)
+        for i, weight in drawn:
+            tree.set(i, weight)
+        return [i for i, _ in drawn]
+
+    def update(self, cid, stat):
+        """Re-weight one question after an answer; unknown ids are ignored."""
+        i = self._pos.get(cid)
+        if i is not None:
+            self._tree.set(i, question_weight(stat))
+
+    def weight(self, cid):
+        i = self._pos.get(cid)
+        return None if i is None else self._tree.values[i]
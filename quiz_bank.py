@@ -0,0 +1,167 @@
+"""
+quiz_bank.py
+
+Usage:
+    from quiz_bank import iter_questions, open_questions, quick_sample, sample_questions
+    for q in iter_questions(path):               # .json list or .jsonl, one question per line
+        ...
+    quiz = sample_questions(path, 20)            # 20 random questions, one pass over the file
+    bank = open_questions(path)                  # compiled, memory-mapped sequence of questions
+    quiz = quick_sample(path, 20)                # None once the compiled cache is up to date
+
+Reading quiz question banks without tkinter. A bank is either the original
+quiz_questions.json (one JSON list, parsed whole) or a JSONL file with one
+question object per line, which is read as a stream so that it never has to
+fit in memory.
+
+sample_questions() draws k questions uniformly from a JSONL bank in a single
+pass with reservoir sampling (Li's Algorithm L): it computes how many lines to
+skip before the next replacement, so only about k * log(n / k) of the n lines
+are ever parsed as JSON. Malformed lines are skipped.
+
+open_questions() returns the bank's valid questions as a sequence backed by a
+compiled cache (see bank_cache.py): the JSON is parsed and checked once, and
+later opens, len() and random access read the cache without parsing.
+
+Compiling a large bank takes seconds, so quick_sample() does not wait for it:
+while the cache is missing or stale it answers with sample_questions() and
+compiles the cache in a background thread, which later quizzes then use.
+"""
+
+import json
+import math
+import random
+import sys
+import threading
+from pathlib import Path
+
+from bank_cache import is_current, open_bank
+
+
+def normalize_question(q):
+    """Return a clean {"question", "options", "answer"} dict, or None if q is unusable."""
+    if not isinstance(q, dict):
+        return None
+    if "question" not in q or "options" not in q or "answer" not in q:
+        return None
+    try:
+        options = [str(opt) for opt in q["options"]]
+        answer = int(q["answer"])
+    except (TypeError, ValueError):
+        return None
+    if not 0 <= answer < len(options):
+        return None
+    return {"question": str(q["question"]), "options": options, "answer": answer}
+
+
+def _parse_line(line):
+    try:
+        return normalize_question(json.loads(line))
+    except ValueError:
+        return None
+
+
+def _uniform(rng):
+    # in (0, 1): the skip computation takes log(u) and log(1 - w)
+    u = rng.random()
+    while u == 0.0:
+        u = rng.random()
+    return u
+
+
+def iter_questions(path):
+    """Yield every valid question in the bank, in file order."""
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        with path.open("rb") as fh:
+            for line in fh:
+                if line.strip():
+                    q = _parse_line(line)
+                    if q is not None:
+                        yield q
+        return
+    with path.open("r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    for item in data:
+        q = normalize_question(item)
+        if q is not None:
+            yield q
+
+
+def sample_questions(path, k, rng=None):
+    """
+    k questions drawn uniformly at random from the bank (all of them if it has
+    fewer), returned in file order. JSONL banks are streamed; a JSON list bank
+    is loaded whole first.
+    """
+    rng = rng or random.Random()
+    path = Path(path)
+    if k <= 0:
+        return []
+    if path.suffix != ".jsonl":
+        questions = list(iter_questions(path))
+        picked = sorted(rng.sample(range(len(questions)), min(k, len(questions))))
+        return [questions[i] for i in picked]
+
+    reservoir = []          # (line number, question)
+    with path.open("rb") as fh:
+        lines = enumerate(line for line in fh if line.strip())
+        for n, line in lines:
+            q = _parse_line(line)
+            if q is not None:
+                reservoir.append((n, q))
+                if len(reservoir) == k:
+                    break
+        else:
+            return [q for _, q in reservoir]
+
+        # Algorithm L: the gap to the next line that enters the reservoir follows
+        # a geometric distribution, so the lines in between are never parsed
+        w = math.exp(math.log(_uniform(rng)) / k)
+        next_n = n + math.floor(math.log(_uniform(rng)) / math.log(1.0 - w)) + 1
+        for n, line in lines:
+            if n < next_n:
+                continue
+            q = _parse_line(line)
+            if q is not None:
+                reservoir[rng.randrange(k)] = (n, q)
+            w *= math.exp(math.log(_uniform(rng)) / k)
+            next_n = n + math.floor(math.log(_uniform(rng)) / math.log(1.0 - w)) + 1
+    return [q for _, q in sorted(reservoir, key=lambda item: item[0])]
+
+
+# one compile of a bank at a time: the background build and a caller that
+# needs the whole bank (a review session) would otherwise write the same file
+_compile_lock = threading.Lock()
+_compiling = set()          # paths with a background compile running
+
+
+def open_questions(path):
+    """Every valid question in the bank as a sequence (compiled cache, rebuilt when the file changes)."""
+    with _compile_lock:
+        _, questions = open_bank(path, lambda p: (None, iter_questions(p)))
+    return questions
+
+
+def _compile(path):
+    try:
+        open_questions(path)
+    except Exception as e:
+        print(f"quiz_bank: could not compile {path.name}: {e}", file=sys.stderr)
+    finally:
+        _compiling.discard(path)
+
+
+def quick_sample(path, k, rng=None):
+    """
+    None if the bank's compiled cache is up to date (draw from open_questions);
+    otherwise k questions from sample_questions, with the cache compiled in a
+    background thread for the next quiz.
+    """
+    path = Path(path)
+    if is_current(path):
+        return None
+    if path not in _compiling:
+        _compiling.add(path)
+        threading.Thread(target=_compile, args=(path,), daemon=True).start()
+    return sample_questions(path, k, rng)
@@ -0,0 +1,162 @@
+"""
+quiz_engine.py
+
+Usage:
+    from quiz_engine import QuizEngine
+    engine = QuizEngine(lambda: questions)       # or a compiled bank: lambda: open_questions(path)
+    engine.start_quiz(shuffle=True)              # or start_quiz(size=20, adaptive=True), start_review(20)
+    while not engine.finished:
+        q = engine.current
+        engine.answer(chosen_option, seconds_taken)
+    print(engine.score, engine.total)
+
+The quiz's state machine without tkinter: which questions a quiz has and in
+what order, the current position, answers and score, and the answer history
+behind spaced repetition (quiz_srs.py) and adaptive sampling
+(quiz_adaptive.py). quiz.launch_quiz is a view over one engine; bench_quiz.py
+drives engines directly to simulate sessions.
+
+bank is a function returning the question sequence. It is called for every
+quiz, so a bank file edited while the app runs is picked up (opening a
+compiled bank is cheap). With sample_size set a quiz draws that many random
+questions; otherwise a quiz is the whole bank.
+
+quick_sample(size, rng), if given, is asked first for a plain quiz of a given
+size: it returns the questions itself (e.g. sampled straight from the file
+while the compiled bank is being rebuilt, quiz_bank.quick_sample) or None to
+draw from bank as usual.
+"""
+
+import random
+
+from quiz_adaptive import AdaptiveSampler
+from quiz_srs import SpacedRepetition, card_id, quality_from_answer
+
+
+class QuizEngine:
+    def __init__(self, bank, sample_size=None, history=None, rng=None, quick_sample=None):
+        self._bank = bank
+        self._quick_sample = quick_sample
+        self.sample_size = sample_size
+        # answer history and review schedule; the bank is only loaded into it
+        # for review sessions and adaptive quizzes
+        self.history = history if history is not None else SpacedRepetition()
+        self.rng = rng or random.Random()
+        self.sampler = None         # AdaptiveSampler, built on the first adaptive quiz
+        self.questions = []         # the current quiz, a read-only sequence
+        self.card_ids = []          # card id per question
+        self.order = []             # question indices in the order they are asked
+        self.index = 0              # position in order
+        self.score = 0
+        self.user_answers = {}      # question index -> selected option
+        self.reviewing = False      # True during a spaced-repetition session
+
+    # --- starting ---
+    def load_history(self):
+        if not self.history.loaded:
+            self.history.load(self._bank())
+        return self.history
+
+    def _begin(self, questions, card_ids, order, reviewing):
+        self.questions = questions
+        self.card_ids = card_ids
+        self.order = order
+        self.reviewing = reviewing
+        self.index = 0
+        self.score = 0
+        self.user_answers = {}
+
+    def start_quiz(self, size=None, shuffle=False, adaptive=False):
+        """
+        New quiz of size questions (default sample_size, or the whole bank).
+        adaptive=True draws by answer history, weak questions first more often.
+        Raises ValueError if the bank has no questions.
+        """
+        size = size or self.sample_size
+        if adaptive:
+            history = self.load_history()
+            if self.sampler is None:
+                self.sampler = AdaptiveSampler(history.positions, history.stats, self.rng)
+            picked = self.sampler.sample(size or len(self.sampler))
+            if not picked:
+                raise ValueError("No valid questions found in the question bank")
+            # already in a random order; only the drawn questions are read
+            questions = [history.bank[i] for i in picked]
+            self._begin(questions, [card_id(q) for q in questions], list(range(len(questions))), False)
+            return
+
+        questions = None
+        if size is not None and self._quick_sample is not None:
+            questions = self._quick_sample(size, self.rng)     # in bank order
+        if questions is None:
+            bank = self._bank()
+            if size is None:
+                questions = bank
+            else:
+                # in bank order; only the chosen questions are read
+                picked = sorted(self.rng.sample(range(len(bank)), min(size, len(bank))))
+                questions = [bank[i] for i in picked]
+        if not len(questions):
+            raise ValueError("No valid questions found in the question bank")
+        order = list(range(len(questions)))
+        if shuffle:
+            self.rng.shuffle(order)
+        self._begin(questions, [card_id(q) for q in questions], order, False)
+
+    def start_review(self, size, now=None):
+        """Spaced-repetition session of up to size due/new cards; False if none is due."""
+        due = self.load_history().due(now=now, limit=size)
+        if not due:
+            return False
+        # most overdue first, so no shuffling
+        self._begin([q for _, q in due], [cid for cid, _ in due], list(range(len(due))), True)
+        return True
+
+    # --- answering ---
+    @property
+    def total(self):
+        return len(self.questions)
+
+    @property
+    def finished(self):
+        return self.index >= len(self.order)
+
+    @property
+    def is_last(self):
+        return self.index == len(self.order) - 1
+
+    @property
+    def current(self):
+        return None if self.finished else self.questions[self.order[self.index]]
+
+    def answer(self, selected, seconds, now=None):
+        """
+        Record the selected option for the current question and move on;
+        returns whether it was right. The answer counts even if saving it to
+        the history fails (the OSError is raised after the move). now
+        (epoch seconds) is for simulations; it defaults to the clock.
+        """
+        if self.finished:
+            raise IndexError("the quiz is already finished")
+        q_idx = self.order[self.index]
+        self.user_answers[q_idx] = selected
+        correct = selected == self.questions[q_idx]["answer"]
+        if correct:
+            self.score += 1
+        self.index += 1
+
+        cid, history = self.card_ids[q_idx], self.history
+        quality = quality_from_answer(correct, seconds)
+        try:
+            if self.reviewing:
+                history.review(cid, quality, now=now, seconds=seconds)
+            else:
+                history.record(cid, quality, seconds, now=now)
+        finally:
+            if self.sampler is not None:
+                self.sampler.update(cid, history.stats.get(cid))
+        return correct
+
+    def review_items(self):
+        """[(question, selected option or None), ...] in bank order, for the review screen."""
+        return [(q, self.user_answers.get(i)) for i, q in enumerate(self.questions)]
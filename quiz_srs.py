@@ -0,0 +1,241 @@
+"""
+quiz_srs.py
+
+Usage:
+    from quiz_srs import SpacedRepetition, quality_from_answer
+    srs = SpacedRepetition()
+    srs.load(questions)                          # a question sequence, e.g. a compiled bank
+    for card_id, q in srs.due(limit=20):
+        ...
+        srs.review(card_id, quality_from_answer(correct, seconds), seconds=seconds)
+    srs.record(card_id, quality_from_answer(correct, seconds), seconds)  # plain quiz answer
+
+Spaced-repetition scheduling for the quiz (SM-2, no tkinter). Each question is
+a card with an ease factor, an interval and a due time. Every answer is
+appended as one line to quiz_reviews.jsonl, and the card states are rebuilt by
+replaying that log on load, so saving a review never rewrites a file.
+
+Answers from ordinary quizzes go into the same log, marked "mode": "quiz".
+They do not move a card's schedule but do count towards its stats (attempts,
+correct answers, total answer time), which quiz_adaptive.py turns into
+sampling weights.
+
+Scheduled cards sit in a min-heap ordered by due time. A review pushes the
+card's new due time and leaves the old entry behind; stale entries are
+recognised and dropped when they reach the top. Finding the next due cards
+therefore costs O(log n) per card even with 100k cards. Cards never answered
+are "new" and are handed out in bank order, NEW_CARDS_PER_SESSION at a time,
+after the due reviews.
+
+Only card id -> bank position is kept for the bank; a question is read from
+the bank (bank[i], decoded from the compiled cache) when it is dealt, so a
+large JSONL bank is not held in memory.
+
+With log_file=None nothing is written: the history lives in memory only (for
+simulations such as bench_quiz.py).
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+REVIEW_LOG_FILE = BASE_DIR / "quiz_reviews.jsonl"
+
+DAY = 86400.0
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+# a card answered wrongly comes back this soon (seconds), within the same day
+RELEARN_DELAY = 600.0
+NEW_CARDS_PER_SESSION = 10
+
+
+def card_id(question):
+    """Stable id of a question: it survives reordering and growth of the bank."""
+    key = "\x1f".join([question["question"]] + question["options"])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def quality_from_answer(correct, seconds):
+    """SM-2 quality (0-5) from whether the answer was right and how long it took."""
+    if not correct:
+        return 1
+    if seconds <= 8:
+        return 5
+    if seconds <= 20:
+        return 4
+    return 3
+
+
+class Card:
+    __slots__ = ("ease", "interval", "reps", "lapses", "due")
+
+    def __init__(self):
+        self.ease = INITIAL_EASE
+        self.interval = 0.0     # days
+        self.reps = 0           # successful reviews in a row
+        self.lapses = 0
+        self.due = 0.0
+
+    def apply(self, quality, now):
+        """SM-2 update for one review of the given quality at time now."""
+        if quality < 3:
+            self.reps = 0
+            self.lapses += 1
+            self.interval = 0.0
+            self.due = now + RELEARN_DELAY
+        else:
+            self.reps += 1
+            if self.reps == 1:
+                self.interval = 1.0
+            elif self.reps == 2:
+                self.interval = 6.0
+            else:
+                self.interval = round(self.interval * self.ease, 1)
+            self.due = now + self.interval * DAY
+        self.ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+
+def is_correct(quality):
+    return quality >= 3
+
+
+class SpacedRepetition:
+    def __init__(self, log_file=REVIEW_LOG_FILE):
+        self.log_file = Path(log_file) if log_file is not None else None
+        self.loaded = False
+        self.bank = []          # the question sequence passed to load
+        self.positions = {}     # card id -> bank index of its first occurrence
+        self.cards = {}         # card id -> Card, for cards reviewed at least once
+        self.stats = {}         # card id -> [attempts, correct, seconds], from every answer
+        self._heap = []         # (due, card id); may hold stale entries
+        self._new_pos = 0       # bank index before which no card is new
+
+    # --- loading ---
+    def load(self, bank):
+        """Register the bank's card ids and replay the review log; bank must stay readable."""
+        self.bank = bank
+        self.positions = {}
+        for i, q in enumerate(bank):
+            self.positions.setdefault(card_id(q), i)
+        self.cards = {}
+        self.stats = {}
+        if self.log_file is not None and self.log_file.exists():
+            with self.log_file.open("rb") as fh:
+                for line in fh:
+                    try:
+                        rec = json.loads(line)
+                        cid, quality, at = rec["card"], int(rec["q"]), float(rec["t"])
+                        seconds = float(rec.get("s", 0.0))
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        continue  # torn or foreign line
+                    self._count(cid, quality, seconds)
+                    if rec.get("mode") != "quiz":
+                        self.cards.setdefault(cid, Card()).apply(quality, at)
+        # cards whose question left the bank keep their history but are not scheduled
+        self._heap = [(card.due, cid) for cid, card in self.cards.items() if cid in self.positions]
+        heapq.heapify(self._heap)
+        self._new_pos = 0
+        self._skip_seen()
+        self.loaded = True
+        return self
+
+    def question(self, cid):
+        return self.bank[self.positions[cid]]
+
+    def _new_at(self, i):
+        # the card at bank index i if it is new (and not a repeat of an earlier question), else None
+        cid = card_id(self.bank[i])
+        return cid if self.positions.get(cid) == i and cid not in self.cards else None
+
+    def _skip_seen(self):
+        while self._new_pos < len(self.bank) and self._new_at(self._new_pos) is None:
+            self._new_pos += 1
+
+    # --- scheduling ---
+    def _is_current(self, entry):
+        card = self.cards.get(entry[1])
+        return card is not None and card.due == entry[0]
+
+    def next_due_time(self):
+        """When the earliest scheduled card is due, or None if nothing is scheduled."""
+        heap = self._heap
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def due(self, now=None, limit=20, new_limit=NEW_CARDS_PER_SESSION):
+        """
+        Up to limit (card id, question) pairs to study now: due reviews, most
+        overdue first, then new cards (at most new_limit of them).
+        """
+        now = time.time() if now is None else now
+        heap, picked, seen = self._heap, [], set()
+        while heap and len(picked) < limit:
+            entry = heapq.heappop(heap)
+            if not self._is_current(entry) or entry[1] in seen:
+                continue
+            if entry[0] > now:
+                heapq.heappush(heap, entry)
+                break
+            picked.append(entry)
+            seen.add(entry[1])
+        for entry in picked:
+            # still scheduled until actually reviewed
+            heapq.heappush(heap, entry)
+        out = [(cid, self.question(cid)) for _, cid in picked]
+
+        pos = self._new_pos
+        while pos < len(self.bank) and len(out) < limit and new_limit > 0:
+            cid = self._new_at(pos)
+            if cid is not None:
+                out.append((cid, self.bank[pos]))
+                new_limit -= 1
+            pos += 1
+        return out
+
+    def review(self, cid, quality, now=None, seconds=0.0):
+        """Record one review answer: update the card, reschedule it and append it to the log."""
+        now = time.time() if now is None else now
+        card = self.cards.get(cid)
+        if card is None:
+            card = self.cards[cid] = Card()
+            if self.positions.get(cid) == self._new_pos:
+                # the first new card has now been seen: skip past it
+                self._skip_seen()
+        card.apply(quality, now)
+        heapq.heappush(self._heap, (card.due, cid))
+        self._count(cid, quality, seconds)
+        self._append({"card": cid, "q": quality, "t": round(now, 3), "s": round(seconds, 2)})
+        return card
+
+    def record(self, cid, quality, seconds, now=None):
+        """Record an answer from an ordinary quiz: it counts in stats but leaves the schedule alone."""
+        now = time.time() if now is None else now
+        self._count(cid, quality, seconds)
+        self._append({"card": cid, "q": quality, "t": round(now, 3), "s": round(seconds, 2), "mode": "quiz"})
+        return self.stats[cid]
+
+    def _count(self, cid, quality, seconds):
+        st = self.stats.get(cid)
+        if st is None:
+            st = self.stats[cid] = [0, 0, 0.0]
+        st[0] += 1
+        st[1] += is_correct(quality)
+        st[2] += seconds
+
+    def _append(self, rec):
+        if self.log_file is None:
+            return
+        with self.log_file.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(rec) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def counts(self):
+        """(scheduled cards, new cards) - for display."""
+        scheduled = sum(1 for cid in self.cards if cid in self.positions)
+        return scheduled, len(self.positions) - scheduled
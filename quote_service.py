@@ -0,0 +1,122 @@
+"""
+quote_service.py
+
+Usage:
+    from quote_service import shared_quotes
+    quotes = shared_quotes()
+    quotes.next()                   # a quote; no repeats until every quote has been shown
+    quotes.refresh()                # re-read motivate_quotes.json if it changed on disk
+    quotes.replace(new_list)        # after saving an edited list
+
+One source of quotes for the home screen and Motivate Me (no tkinter).
+motivate_quotes.json is read once (through its compiled cache, see
+bank_cache.py) and kept in memory; refresh() only re-reads it when the file's
+mtime or size has changed, and next() never touches the disk.
+
+Quotes are dealt from a shuffled bag: each cycle shows every quote once in a
+random order, each pick is a pop from the end of the bag, and a new cycle
+never opens with the quote that closed the previous one. Both screens draw
+from the same shared bag, so moving between them does not repeat quotes.
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+from bank_cache import open_bank
+
+BASE_DIR = Path(__file__).parent
+QUOTES_FILE = BASE_DIR / "motivate_quotes.json"
+
+SAMPLE_QUOTES = [
+    "Success is not final; failure is not fatal: It is the courage to continue that counts.",
+    "Don’t watch the clock; do what it does. Keep going.",
+    "The secret of getting ahead is getting started.",
+    "Believe you can and you're halfway there.",
+    "Your limitation—it’s only your imagination.",
+    "Push yourself, because no one else is going to do it for you."
+]
+
+
+def read_quotes(path):
+    """(None, quotes) from a quotes file, for bank_cache.open_bank."""
+    with Path(path).open("r", encoding="utf-8") as fh:
+        data = json.load(fh)
+        if not isinstance(data, list):
+            raise ValueError("Quotes file malformed (expected list).")
+        return None, [str(q) for q in data if str(q).strip()]
+
+
+class QuoteService:
+    def __init__(self, path=QUOTES_FILE, rng=None):
+        self.path = Path(path)
+        self.quotes = []
+        self._signature = None      # (size, mtime_ns) of the file as loaded
+        self._bag = []              # indices into quotes still to be dealt this cycle
+        self._last = None
+        self._rng = rng or random.Random()
+
+    @property
+    def loaded(self):
+        return self._signature is not None
+
+    def _stat_signature(self):
+        stat = self.path.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def refresh(self):
+        """Load the file if it is new or changed since the last load; returns self."""
+        if not self.path.exists():
+            with self.path.open("w", encoding="utf-8") as fh:
+                json.dump(SAMPLE_QUOTES, fh, indent=2, ensure_ascii=False)
+        signature = self._stat_signature()
+        if signature != self._signature:
+            _, quotes = open_bank(self.path, read_quotes)
+            # an empty file shows the built-in quotes, as Motivate Me always has
+            self._set(list(quotes) or SAMPLE_QUOTES.copy())
+            self._signature = signature
+        return self
+
+    def replace(self, quotes):
+        """Adopt a list just saved to the file, without reading it back."""
+        self._set(list(quotes))
+        try:
+            self._signature = self._stat_signature()
+        except OSError:
+            self._signature = None
+
+    def _set(self, quotes):
+        self.quotes = quotes
+        self._bag = []              # a new cycle over the new list
+
+    def next(self):
+        """The next quote from the bag (loading the file on first use); None if there are none."""
+        if not self.loaded:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"quotes: could not load {self.path.name}, using the built-in quotes: {e}", file=sys.stderr)
+                self._set(SAMPLE_QUOTES.copy())
+                self._signature = (-1, -1)  # do not retry on every pick; refresh() still can
+        if not self.quotes:
+            return None
+        if not self._bag:
+            bag = list(range(len(self.quotes)))
+            self._rng.shuffle(bag)
+            if len(bag) > 1 and self.quotes[bag[-1]] == self._last:
+                bag[0], bag[-1] = bag[-1], bag[0]
+            self._bag = bag
+        self._last = self.quotes[self._bag.pop()]
+        return self._last
+
+
+_shared = None
+
+
+def shared_quotes():
+    """The app-wide QuoteService (one bag for every screen)."""
+    global _shared
+    if _shared is None:
+        _shared = QuoteService()
+    return _shared
@@ -0,0 +1,111 @@
+"""
+summarize_cli.py
+
+Usage:
+    python summarize_cli.py NOTES_DIR [-o summaries.jsonl] [--pattern "*.txt"]
+
+Summarizes every notes file under NOTES_DIR without the GUI (no tkinter import,
+so it runs on headless machines). Files are streamed from disk and grouped into
+dynamic batches bounded by a token budget, so many short notes share one
+pipeline call. One JSON object per file is written to the output as soon as its
+batch finishes; throughput (docs/s, tokens/s) is reported on stderr.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import summarizer
+
+
+def iter_notes(notes_dir, patterns):
+    """Yield (path, text) for each matching, non-empty file, without reading ahead."""
+    seen = set()  # a file matched by several patterns is summarized once
+    for pattern in patterns:
+        for path in sorted(Path(notes_dir).rglob(pattern)):
+            if not path.is_file():
+                continue
+            resolved = path.resolve()
+            if resolved in seen:
+                continue
+            seen.add(resolved)
+            try:
+                text = path.read_text(encoding="utf-8", errors="replace").strip()
+            except OSError as e:
+                print(f"skipping {path}: {e}", file=sys.stderr)
+                continue
+            if text:
+                yield path, text
+
+
+def iter_batches(notes, batch_tokens, max_batch):
+    """
+    Group (path, text) pairs into batches whose total token count stays under
+    batch_tokens (a single oversized file still forms its own batch).
+    Yields lists of (path, text, n_tokens).
+    """
+    batch, batch_len = [], 0
+    for path, text in notes:
+        n_tokens = summarizer.count_tokens([text])[0]
+        if batch and (batch_len + n_tokens > batch_tokens or len(batch) >= max_batch):
+            yield batch
+            batch, batch_len = [], 0
+        batch.append((path, text, n_tokens))
+        batch_len += n_tokens
+    if batch:
+        yield batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a folder of notes files into JSONL.")
+    parser.add_argument("notes_dir", help="directory to scan (recursively) for notes files")
+    parser.add_argument("-o", "--output", default="-", help="output JSONL file (default: stdout)")
+    parser.add_argument("--pattern", action="append",
+                        help="glob pattern(s) for notes files (default: *.txt and *.md)")
+    parser.add_argument("--batch-tokens", type=int, default=4096,
+                        help="token budget per pipeline batch (default: 4096)")
+    parser.add_argument("--max-batch", type=int, default=16, help="max files per batch (default: 16)")
+    parser.add_argument("--max-length", type=int, default=80)
+    parser.add_argument("--min-length", type=int, default=25)
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the summary cache")
+    args = parser.parse_args(argv)
+
+    if not Path(args.notes_dir).is_dir():
+        parser.error(f"not a directory: {args.notes_dir}")
+    patterns = args.pattern or ["*.txt", "*.md"]
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    docs = tokens = 0
+    start = time.perf_counter()
+    try:
+        notes = iter_notes(args.notes_dir, patterns)
+        for batch in iter_batches(notes, args.batch_tokens, args.max_batch):
+            summaries = summarizer.summarize_batch([text for _, text, _ in batch],
+                                                   max_length=args.max_length, min_length=args.min_length,
+                                                   use_cache=not args.no_cache)
+            for (path, _, n_tokens), summary in zip(batch, summaries):
+                record = {"file": str(path.relative_to(args.notes_dir)), "tokens": n_tokens, "summary": summary}
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            docs += len(batch)
+            tokens += sum(n for _, _, n in batch)
+            elapsed = time.perf_counter() - start
+            print(f"{docs} docs, {tokens} tokens in {elapsed:.1f}s "
+                  f"({docs / elapsed:.2f} docs/s, {tokens / elapsed:.0f} tokens/s)", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    if docs:
+        print(f"done: {docs} docs, {tokens} tokens in {elapsed:.1f}s - "
+              f"{docs / elapsed:.2f} docs/s, {tokens / elapsed:.0f} tokens/s", file=sys.stderr)
+    else:
+        print("no notes files found", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
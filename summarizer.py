@@ -1,11 +1,486 @@
-from transformers import pipeline
+import os
+import re
+import sys
+import threading
+import time
 
-# Load the summarization pipeline once at import
-summarizer = pipeline("summarization", model="t5-small")
+MODEL_NAME = "t5-small"
 
-def summarize_notes(notes_text):
-    # HuggingFace models work best with < 2000 chars
-    if len(notes_text) > 2000:
-        notes_text = notes_text[:2000]
-    result = summarizer(notes_text, max_length=80, min_length=25, do_sample=False)
-    return result[0]['summary_text']
+# Inference backend: "fp32" runs the model as shipped; "int8" applies PyTorch
+# dynamic int8 quantization to its Linear layers (faster on CPU-only machines).
+# Override with the SUMMARIZER_BACKEND environment variable.
+BACKENDS = ("fp32", "int8")
+BACKEND = os.environ.get("SUMMARIZER_BACKEND", "fp32").lower()
+if BACKEND not in BACKENDS:
+    # a typo in the environment must not stop the app from starting
+    print(f"summarizer: unknown SUMMARIZER_BACKEND {BACKEND!r}, expected one of {BACKENDS}; using fp32",
+          file=sys.stderr)
+    BACKEND = "fp32"
+
+# t5-small reads at most 512 tokens; keep chunks below that so the
+# "summarize: " prefix and special tokens still fit.
+CHUNK_TOKENS = 450
+CHUNK_BATCH_SIZE = 4
+
+
+class SummaryCancelled(Exception):
+    """Raised inside summarize_notes when its cancel_event is set."""
+
+
+def _resident_memory_mb():
+    # best effort: psutil if installed, /proc on Linux, peak RSS from resource elsewhere
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except Exception:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except Exception:
+        return None
+
+
+class ModelManager:
+    """
+    Owns the summarization pipeline. Nothing heavy happens at import: the model
+    is built either on first use (get()) or ahead of time on a background
+    thread (preload()). Timings of each cold-start stage are kept in stats().
+    """
+
+    def __init__(self, model_name=MODEL_NAME, backend=BACKEND):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown summarizer backend {backend!r}; expected one of {BACKENDS}")
+        self.model_name = model_name
+        self.backend = backend
+        self._pipeline = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "model": model_name,
+            "backend": backend,
+            "mode": None,  # "preload" or "on-demand", whichever triggered the load
+            "import_seconds": None,
+            "load_seconds": None,
+            "rss_before_mb": None,
+            "rss_after_mb": None,
+            "first_inference_seconds": None,
+        }
+
+    @property
+    def loaded(self):
+        return self._pipeline is not None
+
+    @property
+    def cache_label(self):
+        # quantized output differs slightly from fp32, so the two must not share cache entries
+        return self.model_name if self.backend == "fp32" else f"{self.model_name}/{self.backend}"
+
+    def get(self, mode="on-demand"):
+        if self._pipeline is None:
+            with self._lock:
+                if self._pipeline is None:
+                    self._load(mode)
+        return self._pipeline
+
+    def preload(self):
+        """Load the model on a daemon thread; returns the thread."""
+        t = threading.Thread(target=self.get, args=("preload",), name="summarizer-preload", daemon=True)
+        t.start()
+        return t
+
+    def _load(self, mode):
+        self._stats["mode"] = mode
+        self._stats["rss_before_mb"] = _resident_memory_mb()
+        t0 = time.perf_counter()
+        from transformers import pipeline
+        t1 = time.perf_counter()
+        pipe = pipeline("summarization", model=self.model_name)
+        if self.backend == "int8":
+            import torch
+            pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+        t2 = time.perf_counter()
+        self._stats["import_seconds"] = t1 - t0
+        self._stats["load_seconds"] = t2 - t1
+        self._stats["rss_after_mb"] = _resident_memory_mb()
+        self._pipeline = pipe
+        print(f"summarizer: {self.model_name} [{self.backend}] loaded ({mode}) - import {t1 - t0:.2f}s, "
+              f"load {t2 - t1:.2f}s, rss {self._stats['rss_after_mb'] or 0:.0f} MB", file=sys.stderr)
+
+    def run(self, inputs, **kwargs):
+        pipe = self.get()
+        t0 = time.perf_counter()
+        result = pipe(inputs, **kwargs)
+        if self._stats["first_inference_seconds"] is None:
+            self._stats["first_inference_seconds"] = time.perf_counter() - t0
+            print(f"summarizer: first inference {self._stats['first_inference_seconds']:.2f}s", file=sys.stderr)
+        return result
+
+    def stats(self):
+        return dict(self._stats, loaded=self.loaded)
+
+
+model = ModelManager()
+
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _split_sentences(text):
+    return [s.strip() for s in _SENTENCE_RE.split(text) if s and s.strip()]
+
+
+def chunk_text(text, max_tokens=CHUNK_TOKENS):
+    """
+    Split text into chunks of at most max_tokens t5 tokens, cutting on sentence
+    boundaries where possible. Returns a list of strings.
+    """
+    sentences = _split_sentences(text)
+    if not sentences:
+        return []
+    # one batched call to the fast tokenizer instead of one call per sentence
+    counts = [len(ids) for ids in
+              model.get().tokenizer(sentences, add_special_tokens=False)["input_ids"]]
+
+    chunks = []
+    current, current_len = [], 0
+    for sentence, count in zip(sentences, counts):
+        if count > max_tokens:
+            # a single huge "sentence" (e.g. a pasted table); split it by words
+            if current:
+                chunks.append(" ".join(current))
+                current, current_len = [], 0
+            words = sentence.split()
+            step = max(1, len(words) * max_tokens // count)
+            for i in range(0, len(words), step):
+                chunks.append(" ".join(words[i:i + step]))
+            continue
+        if current and current_len + count > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_len = [], 0
+        current.append(sentence)
+        current_len += count
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise SummaryCancelled()
+
+
+def _summarize_chunks(chunks, on_partial=None, cancel_event=None, max_length=60, min_length=10):
+    # map step: summarize chunks in batches, reporting progress after each batch
+    summaries = []
+    for start in range(0, len(chunks), CHUNK_BATCH_SIZE):
+        _check_cancelled(cancel_event)
+        batch = chunks[start:start + CHUNK_BATCH_SIZE]
+        results = model.run(batch, max_length=max_length, min_length=min_length,
+                            do_sample=False, truncation=True, batch_size=len(batch))
+        summaries.extend(r["summary_text"] for r in results)
+        if on_partial:
+            on_partial(" ".join(summaries), len(summaries), len(chunks))
+    return summaries
+
+
+def summarize_notes(notes_text, on_partial=None, cancel_event=None,
+                    max_length=80, min_length=25, do_sample=False, use_cache=True):
+    """
+    Summarize notes of any length. Short notes go through the model in a single
+    pass; longer notes are split into tokenizer-sized chunks, each chunk is
+    summarized (map) and the joined chunk summaries are summarized again (reduce).
+
+    on_partial(partial_text, chunks_done, chunks_total) is called after every
+    batch of chunks so the UI can show output before the whole document is done.
+    If cancel_event (a threading.Event) is set, SummaryCancelled is raised at the
+    next batch boundary.
+
+    Results are stored in the on-disk summary cache (see summary_cache.py), so
+    summarizing the same notes again with the same settings skips the model
+    (and, on a cold start, the model load).
+    """
+    cache = key = None
+    if use_cache:
+        from summary_cache import get_cache
+        cache = get_cache()
+        key = cache.make_key(notes_text, model.cache_label, max_length, min_length, do_sample)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    chunks = chunk_text(notes_text)
+    while len(chunks) > 1:
+        summaries = _summarize_chunks(chunks, on_partial, cancel_event)
+        # reduce: if the joined summaries still exceed one chunk, summarize again
+        chunks = chunk_text(" ".join(summaries))
+        on_partial = None
+    _check_cancelled(cancel_event)
+    text = chunks[0] if chunks else notes_text
+    result = model.run(text, max_length=max_length, min_length=min_length,
+                       do_sample=do_sample, truncation=True)
+    summary = result[0]['summary_text']
+    if cache is not None:
+        cache.put(key, summary)
+    return summary
+
+
+def count_tokens(texts):
+    """Number of t5 tokens in each of texts (one batched tokenizer call)."""
+    if not texts:
+        return []
+    return [len(ids) for ids in model.get().tokenizer(list(texts), add_special_tokens=False)["input_ids"]]
+
+
+def summarize_batch(texts, max_length=80, min_length=25, do_sample=False, use_cache=True):
+    """
+    Summarize several notes at once, returning summaries in the same order.
+    Notes that fit in one chunk share a single batched pipeline call; longer
+    notes go through summarize_notes' map-reduce path one at a time.
+    """
+    results = [None] * len(texts)
+    cache = None
+    if use_cache:
+        from summary_cache import get_cache
+        cache = get_cache()
+    keys = [cache.make_key(t, model.cache_label, max_length, min_length, do_sample) if cache else None
+            for t in texts]
+
+    pending = []  # (index, single chunk text)
+    computed = []
+    for i, text in enumerate(texts):
+        if cache is not None:
+            results[i] = cache.get(keys[i])
+            if results[i] is not None:
+                continue
+        computed.append(i)
+        chunks = chunk_text(text)
+        if len(chunks) <= 1:
+            pending.append((i, chunks[0] if chunks else text))
+        else:
+            results[i] = summarize_notes(text, max_length=max_length, min_length=min_length,
+                                         do_sample=do_sample, use_cache=False)
+
+    if pending:
+        outputs = model.run([text for _, text in pending], max_length=max_length, min_length=min_length,
+                            do_sample=do_sample, truncation=True, batch_size=len(pending))
+        for (i, _), out in zip(pending, outputs):
+            results[i] = out["summary_text"]
+
+    if cache is not None:
+        for i in computed:
+            cache.put(keys[i], results[i])
+    return results
+
+
+# paragraphs shorter than this are kept verbatim; t5 pads tiny inputs with filler
+MIN_PARAGRAPH_TOKENS = 40
+# paragraph and group summaries are at most this long (also the generation max_length)
+PARTIAL_SUMMARY_TOKENS = 60
+# reduce groups: a group ends after a summary whose hash is 0 mod GROUP_SPLIT
+# (content-defined, so an inserted paragraph only changes the groups around it)
+# or once it holds GROUP_MAX summaries, which keeps it within one chunk
+GROUP_SPLIT = 4
+GROUP_MAX = CHUNK_TOKENS // PARTIAL_SUMMARY_TOKENS
+
+
+def _summarize_texts(texts, lengths, cancel_event=None, on_chunk=None):
+    """
+    Summaries (at most PARTIAL_SUMMARY_TOKENS) of texts whose token counts are
+    already known. A text longer than one chunk is map-reduced on its own, with
+    on_chunk(i, partial_text) after each batch of its chunks.
+    """
+    results = [None] * len(texts)
+    fits = [i for i, n in enumerate(lengths) if n <= CHUNK_TOKENS]
+    if fits:
+        outputs = model.run([texts[i] for i in fits], max_length=PARTIAL_SUMMARY_TOKENS, min_length=10,
+                            do_sample=False, truncation=True, batch_size=len(fits))
+        for i, out in zip(fits, outputs):
+            results[i] = out["summary_text"]
+    for i, n in enumerate(lengths):
+        if n > CHUNK_TOKENS:
+            # a very long paragraph: chunked map-reduce of its own
+            progress = (lambda partial, done, total, i=i: on_chunk(i, partial)) if on_chunk else None
+            results[i] = summarize_notes(texts[i], on_partial=progress, cancel_event=cancel_event,
+                                         max_length=PARTIAL_SUMMARY_TOKENS, min_length=10, use_cache=False)
+    return results
+
+
+def _reduce_groups(keys):
+    """
+    Split a level's summary keys into groups of at least two, returning
+    [(group key, member keys), ...]; a leftover single key is its own group.
+    """
+    import hashlib
+
+    groups, current = [], []
+    for key in keys:
+        current.append(key)
+        boundary = int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16) % GROUP_SPLIT == 0
+        if len(current) >= GROUP_MAX or (boundary and len(current) >= 2):
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return [("group:" + hashlib.sha1("|".join(g).encode("utf-8")).hexdigest() if len(g) > 1 else g[0], g)
+            for g in groups]
+
+
+def summarize_notes_incremental(notes_text, store, on_partial=None, cancel_event=None):
+    """
+    Summarize notes paragraph by paragraph, reusing the per-paragraph summaries
+    saved in store (a notes_store.NotesStore) for every paragraph whose content
+    hash is unchanged. Only new or edited paragraphs go through the model.
+
+    The paragraph summaries are then reduced in a tree: consecutive summaries
+    are grouped (content-defined boundaries, each group fits one chunk), each
+    group is summarized and stored under a key made from its members' keys, and
+    so on until one group is left, which gets the final summarize_notes pass.
+    An edit to one paragraph therefore re-runs only the groups above it plus
+    the final pass, not a reduce over the whole note.
+
+    on_partial(partial_text, done, total) reports progress over the changed
+    paragraphs only.
+    """
+    from notes_store import split_paragraphs, paragraph_hash
+
+    paragraphs = split_paragraphs(notes_text)
+    if not paragraphs:
+        return ""
+    hashes = [paragraph_hash(p) for p in paragraphs]
+    known = store.load_summaries(model.cache_label)
+    current = {}
+
+    todo = {}
+    for h, p in zip(hashes, paragraphs):
+        if h not in known and h not in todo:
+            todo[h] = p
+    if todo:
+        # one tokenizer call decides what is kept verbatim and what needs chunking
+        lengths = count_tokens(list(todo.values()))
+        to_model = []
+        for (h, p), n_tokens in zip(todo.items(), lengths):
+            if n_tokens < MIN_PARAGRAPH_TOKENS:
+                known[h] = p
+            else:
+                to_model.append((h, n_tokens))
+        for start in range(0, len(to_model), CHUNK_BATCH_SIZE):
+            _check_cancelled(cancel_event)
+            batch = to_model[start:start + CHUNK_BATCH_SIZE]
+            on_chunk = None
+            if on_partial:
+                # a paragraph too long for one chunk (notes without blank lines)
+                # shows its chunk summaries as they arrive
+                def on_chunk(i, partial, start=start):
+                    shown = [known[h] for h, _ in to_model[:start]] + [partial]
+                    on_partial(" ".join(shown), start, len(to_model))
+            summaries = _summarize_texts([todo[h] for h, _ in batch], [n for _, n in batch],
+                                         cancel_event, on_chunk)
+            for (h, _), summary in zip(batch, summaries):
+                known[h] = summary
+            if on_partial:
+                done = min(start + CHUNK_BATCH_SIZE, len(to_model))
+                on_partial(" ".join(known[h] for h, _ in to_model[:done]), done, len(to_model))
+    for h in hashes:
+        current[h] = known[h]
+
+    # reduce tree, reusing every group whose members are unchanged
+    level = hashes
+    while len(level) > GROUP_MAX:
+        groups = _reduce_groups(level)
+        missing = [(key, members) for key, members in groups if key not in known and len(members) > 1]
+        for start in range(0, len(missing), CHUNK_BATCH_SIZE):
+            _check_cancelled(cancel_event)
+            batch = missing[start:start + CHUNK_BATCH_SIZE]
+            texts = [" ".join(current[m] for m in members) for _, members in batch]
+            # each group is at most GROUP_MAX summaries, so it fits one chunk
+            for (key, _), summary in zip(batch, _summarize_texts(texts, [0] * len(texts), cancel_event)):
+                known[key] = summary
+        for key, members in groups:
+            current[key] = known[key] if len(members) > 1 else current[key]
+        level = [key for key, _ in groups]
+
+    # keep only the paragraphs and groups that are still in the notes
+    store.save_summaries(model.cache_label, current)
+
+    _check_cancelled(cancel_event)
+    combined = " ".join(current[k] for k in level)
+    if len(paragraphs) == 1:
+        return combined
+    # the final pass is cached on its input text (summary_cache.py)
+    return summarize_notes(combined, cancel_event=cancel_event)
+
+
+# --- Fast extractive mode (no model; TF-IDF + TextRank over NumPy) ---
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by can do does for from had has have he her his how i if in into is "
+    "it its of on or our she so such than that the their them then there these they this to was we "
+    "were what when where which while who why will with would you your".split()
+)
+
+
+def summarize_extractive(notes_text, max_sentences=5):
+    """
+    Pick the max_sentences most central sentences of the notes, in their
+    original order. Sentences are TF-IDF vectors; centrality is TextRank over
+    their cosine-similarity graph. X is kept sparse (one entry per distinct
+    word of each sentence, coordinate form) and the n x n similarity matrix is
+    never built: with unit-length rows, each power-iteration step is
+    X @ (X.T @ v), two bincounts over the nonzeros, so time and memory grow with
+    the length of the notes rather than with sentences x vocabulary.
+    """
+    import numpy as np
+
+    sentences = _split_sentences(notes_text)
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    vocab = {}
+    rows, cols = [], []
+    for i, sentence in enumerate(sentences):
+        for word in _WORD_RE.findall(sentence.lower()):
+            if word not in _STOPWORDS:
+                rows.append(i)
+                cols.append(vocab.setdefault(word, len(vocab)))
+    if not vocab:
+        return " ".join(sentences[:max_sentences])
+
+    n, m = len(sentences), len(vocab)
+    # one (row, col, tf) entry per distinct word of a sentence
+    keys, tf = np.unique(np.asarray(rows, dtype=np.int64) * m + np.asarray(cols, dtype=np.int64),
+                         return_counts=True)
+    rows, cols = keys // m, keys % m
+    df = np.bincount(cols, minlength=m)
+    data = np.log1p(tf) * (np.log((n + 1) / (df[cols] + 1)) + 1.0)
+    norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=n))
+    data = data / np.where(norms > 0, norms, 1.0)[rows]
+    self_sim = np.bincount(rows, weights=data * data, minlength=n)  # 1 for non-empty rows, 0 otherwise
+
+    def x_dot(u):       # X @ u
+        return np.bincount(rows, weights=data * u[cols], minlength=n)
+
+    def xt_dot(v):      # X.T @ v
+        return np.bincount(cols, weights=data * v[rows], minlength=m)
+
+    # TextRank on W = X X^T without its diagonal: W @ v == X @ (X.T @ v) - self_sim * v
+    degree = x_dot(np.bincount(cols, weights=data, minlength=m)) - self_sim
+    degree[degree <= 0] = 1.0
+    damping = 0.85
+    scores = np.full(n, 1.0 / n)
+    for _ in range(30):
+        v = scores / degree
+        updated = (1 - damping) / n + damping * (x_dot(xt_dot(v)) - self_sim * v)
+        if np.abs(updated - scores).sum() < 1e-6:
+            scores = updated
+            break
+        scores = updated
+
+    top = np.sort(np.argpartition(-scores, max_sentences)[:max_sentences])
+    return " ".join(sentences[i] for i in top)
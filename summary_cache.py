@@ -0,0 +1,111 @@
+"""
+summary_cache.py
+
+Usage:
+    from summary_cache import get_cache
+    cache = get_cache()
+    key = cache.make_key(text, "t5-small", max_length=80, min_length=25, do_sample=False)
+    summary = cache.get(key)          # None on a miss
+    cache.put(key, summary)
+
+Disk-backed, content-addressed cache for note summaries. Entries live in a small
+SQLite file next to the app so they survive restarts; the least recently used
+entries are evicted once the cache holds more than max_entries summaries.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+CACHE_FILE = BASE_DIR / "summary_cache.sqlite3"
+MAX_ENTRIES = 500
+
+
+def normalize_text(text):
+    # whitespace-only edits (re-pasting, trailing newlines) should still hit the cache
+    return " ".join(text.split())
+
+
+class SummaryCache:
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            # the summary worker thread and the UI thread may both use the cache
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                " key TEXT PRIMARY KEY, summary TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS summaries_lru ON summaries(last_used)")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def make_key(text, model_name, max_length, min_length, do_sample):
+        h = hashlib.sha256()
+        h.update(normalize_text(text).encode("utf-8"))
+        h.update(f"\0{model_name}\0{max_length}\0{min_length}\0{bool(do_sample)}".encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, summary):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO summaries (key, summary, last_used) VALUES (?, ?, ?)",
+                         (key, summary, time.time()))
+            # evict least recently used entries beyond the bound
+            conn.execute(
+                "DELETE FROM summaries WHERE key IN ("
+                " SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM summaries")
+            conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = SummaryCache()
+    return _cache
@@ -0,0 +1,122 @@
+"""
+summary_worker.py
+
+Usage:
+    from summary_worker import SummaryWorker
+    worker = SummaryWorker()
+    job = worker.submit(notes_text)
+    # then poll from the Tk loop:  root.after(100, lambda: worker.poll())
+
+Runs summarize jobs on a background thread so the Tk event loop never blocks on
+the transformers import, the model load or inference. Results are handed back
+through a queue that the UI drains with root.after polling; no tkinter calls
+are made from the worker thread.
+"""
+
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SummaryJob:
+    def __init__(self, job_id, text, mode="abstractive", store=None):
+        self.id = job_id
+        self.text = text
+        self.mode = mode
+        self.store = store
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+
+class SummaryWorker:
+    """
+    Single-threaded summarize pool. Only one job runs at a time (two t5 runs
+    would just fight over the same CPU cores); submitting a new job cancels the
+    running one, which stops at its next chunk boundary.
+
+    poll() returns the events produced since the last call as a list of
+    (job_id, kind, payload) tuples, where kind is one of:
+        "partial"   payload = (partial_text, chunks_done, chunks_total)
+        "done"      payload = summary text
+        "error"     payload = the exception
+        "cancelled" payload = None
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+        self._events = queue.Queue()
+        self._ids = itertools.count(1)
+        self._current = None
+
+    @property
+    def current(self):
+        return self._current
+
+    def submit(self, text, mode="abstractive", store=None):
+        """
+        mode is "abstractive" (t5) or "fast" (extractive, no model). With a
+        notes_store.NotesStore, abstractive jobs only re-summarize the
+        paragraphs that changed since the last run.
+        """
+        self.cancel()
+        job = SummaryJob(next(self._ids), text, mode, store)
+        self._current = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def cancel(self, job=None):
+        """Cancel job (default: the current one)."""
+        job = job or self._current
+        if job is not None:
+            job.cancel()
+            if job is self._current:
+                self._current = None
+
+    def poll(self):
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job):
+        if job.cancelled:
+            self._events.put((job.id, "cancelled", None))
+            return
+        try:
+            # imported here so the transformers import and model load happen on this thread
+            from summarizer import (summarize_notes, summarize_notes_incremental, summarize_extractive,
+                                    SummaryCancelled)
+        except Exception as e:
+            self._events.put((job.id, "error", e))
+            return
+
+        def on_partial(partial, done, total):
+            self._events.put((job.id, "partial", (partial, done, total)))
+
+        try:
+            if job.mode == "fast":
+                summary = summarize_extractive(job.text)
+            elif job.store is not None:
+                summary = summarize_notes_incremental(job.text, job.store, on_partial=on_partial,
+                                                      cancel_event=job.cancel_event)
+            else:
+                summary = summarize_notes(job.text, on_partial=on_partial, cancel_event=job.cancel_event)
+        except SummaryCancelled:
+            self._events.put((job.id, "cancelled", None))
+        except Exception as e:
+            self._events.put((job.id, "error", e))
+        else:
+            self._events.put((job.id, "done", summary))